@@ -18,10 +18,10 @@ def run_tests():
     #         "--test-threads=1",
     #     ]
     # )
-    subprocess.run(["python", "-m", "pip", "install", "maturin","pytest"])
+    subprocess.run(["python", "-m", "pip", "install", "maturin"])
     subprocess.run(["maturin","build"])
-    subprocess.run(["python", "-m", "pip", "install", "."])
-    pytest_rv = subprocess.run(["python", "-m", "pytest", "-svv"])
+    subprocess.run(["python", "-m", "pip", "install", ".[test]"])
+    pytest_rv = subprocess.run(["python", "-m", "pytest", "-svv", "-n", "auto", "--dist", "loadfile"])
 
     if pytest_rv.returncode:
         raise RuntimeError(
@@ -9,6 +9,6 @@ def run_tests():
     venv = VirtualEnv(os.path.join(angreal.get_root(),"..",".venv"))
     venv._create()
     venv._activate()
-    subprocess.run(["python", "-m", "pip", "install", "maturin","pytest"])
+    subprocess.run(["python", "-m", "pip", "install", "maturin","pytest","pytest-xdist"])
     
 
@@ -1,18 +1,59 @@
 import pytest
 import docker_pyo3
+import contextlib
 import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# every container the suite creates carries this label, each xdist worker imports conftest on its own so
+# a worker only ever sweeps up what it created
+RUN_LABEL = "docker-pyo3.test-run"
+RUN_ID = uuid.uuid4().hex[:8]
+
+BUSYBOX = "busybox:latest"
+
+WORKER = os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+def unique_prefix():
+    """a resource name prefix no other test, xdist worker or concurrent run will produce"""
+    return f"{WORKER}-{uuid.uuid4().hex[:8]}-"
+
+def _poll(predicate, timeout=10.0, interval=0.05):
+    """
+    poll `predicate` until it returns something truthy and return that, backing off exponentially from 10ms up to
+    `interval` between tries. raises TimeoutError once `timeout` seconds have passed
+    """
+    deadline = time.monotonic() + timeout
+    n = 0
+    while True:
+        result = predicate()
+        if result:
+            return result
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"condition not met within {timeout}s")
+        time.sleep(min(interval, 0.01 * 2 ** n))
+        n += 1
 
-try:
-    pw = os.environ.get("DOCKER_PASSWORD", None)
-    un = os.environ.get("DOCKER_USERNAME",None)
-    if pw and un:
-        print("PULLING WITH ENVIRONMENTAL VARIABLES")
-        docker.images().pull(image='busybox',auth_password = dict(username=un,password=pw))
-    else:
-        docker.images().pull(image='busybox')
-except Exception as e:
-    print("might fail because of docker pull limits/ container availability")
 
+@pytest.fixture(scope="session")
+def wait_for():
+    """the polling helper above, handed out as a fixture so test modules never import from conftest"""
+    return _poll
+
+
+def remove_all(containers):
+    """
+    force remove `containers` concurrently, ignoring any that are already gone. remove() releases the GIL while the
+    daemon works, so the round trips overlap instead of queueing
+    """
+    def _remove(c):
+        with contextlib.suppress(docker_pyo3.DockerError):
+            c.remove(force=True)
+
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        list(ex.map(_remove, containers))
 
 def pytest_itemcollected(item):
     """
@@ -21,31 +62,191 @@ def pytest_itemcollected(item):
     :return:
     """
     if item._obj.__doc__:
-        item._nodeid = f"{item.obj.__doc__.strip().ljust(50,' ')[:50]}{str(item._nodeid).ljust(100,' ')[:50]}"
+        # keep the full node id, truncating it collapses parametrized cases onto the same id
+        item._nodeid = f"{item.obj.__doc__.strip().ljust(50,' ')[:50]}{item._nodeid}"
 
-@pytest.fixture
-def docker():
+def pytest_collection_modifyitems(config, items):
+    """
+    mark everything that needs the daemon, directly or through another fixture, so `-m "not docker"` runs the
+    rest without one
+    :return:
+    """
+    for item in items:
+        if "docker" in item.fixturenames:
+            item.add_marker(pytest.mark.docker)
+
+
+@pytest.fixture(scope="session")
+def docker_health():
+    """the daemon's health_check(), taken once for the whole session"""
+    return docker_pyo3.Docker().health_check()
+
+
+@pytest.fixture(scope="session")
+def docker(docker_health):
+    """
+    the client shared by the whole session. every test needing it is skipped straight away if the session's
+    health check couldn't reach the daemon, pytest caches the skip so the check is never repeated
+    :return:
+    """
+    if not docker_health["healthy"]:
+        pytest.skip(f"docker daemon unreachable: {docker_health['error']}")
     return docker_pyo3.Docker()
 
 
+@pytest.fixture(scope="session")
+def docker_alt(docker):
+    """a second, independent client for tests that check two clients agree"""
+    return docker_pyo3.Docker()
+
+
+@pytest.fixture(scope="session")
+def prewarm_images(docker):
+    """
+    pull the images the suite needs once, up front, so individual tests never pay for a registry round trip.
+    reruns against a daemon that already has them skip the registry entirely
+    :return:
+    """
+    try:
+        docker.images().get(BUSYBOX).inspect()
+        return
+    except docker_pyo3.NotFoundError:
+        pass
+
+    pw = os.environ.get("DOCKER_PASSWORD", None)
+    un = os.environ.get("DOCKER_USERNAME",None)
+    try:
+        if pw and un:
+            print("PULLING WITH ENVIRONMENTAL VARIABLES")
+            docker.images().pull(image=BUSYBOX,auth_password = dict(username=un,password=pw))
+        else:
+            docker.images().pull(image=BUSYBOX)
+    except docker_pyo3.DockerError:
+        print("might fail because of docker pull limits/ container availability")
+
+
+@pytest.fixture(scope="session")
+def busybox(prewarm_images):
+    """the image containers are created from, pulled once by prewarm_images so changing the tag is a one-liner"""
+    return BUSYBOX
+
+
+class TeardownRegistry:
+    """
+    remembers resources created by tests and removes them at the end of the session, regardless of test outcome
+    """
+
+    def __init__(self, docker):
+        self.docker = docker
+        self.images = []
+
+    def track_image(self, name):
+        self.images.append(name)
+
+    def teardown(self):
+        # exited containers from this run go in one prune, only the ones still running need removing one by one
+        run_filter = {"label": f"{RUN_LABEL}={RUN_ID}"}
+        with contextlib.suppress(docker_pyo3.DockerError):
+            self.docker.containers().prune(filters=run_filter)
+        remove_all(self.docker.containers().get(c["Id"])
+                   for c in self.docker.containers().list(all=True, filters=run_filter))
+        # labelled networks go in one prune, a no-op when there are none
+        with contextlib.suppress(docker_pyo3.DockerError):
+            self.docker.networks().prune(filters=run_filter)
+        # built images carry the run label too, tagged or not they go in one prune
+        with contextlib.suppress(docker_pyo3.DockerError):
+            self.docker.images().prune(filters={**run_filter, "dangling": "false"})
+        for name in self.images:
+            with contextlib.suppress(docker_pyo3.DockerError):
+                self.docker.images().get(name).delete()
+
+
+@pytest.fixture(scope="session")
+def teardown_registry(docker):
+    registry = TeardownRegistry(docker)
+    yield registry
+    registry.teardown()
+
+
 @pytest.fixture
-def image_pull():
-    docker_pyo3.Docker().images().get('busybox')
-    yield
-    
-    
+def name_prefix(docker):
+    """
+    prefix for the names of anything a test creates, containers, networks and volumes still carrying it when the
+    test ends are removed in a single cleanup call
+    :return:
+    """
+    prefix = unique_prefix()
+    yield prefix
+    docker.cleanup(prefix)
+
+
+@pytest.fixture(scope="session")
+def run_labels(teardown_registry):
+    """labels to attach to every container, network or image a test creates, anything carrying them is swept up at session end"""
+    return {RUN_LABEL: RUN_ID}
+
 
 @pytest.fixture
-def running_container():
-    image = docker_pyo3.Docker().images().get('busybox')
-    container = docker_pyo3.Docker().containers().create(image='busybox',name="busybox")
+def make_container(docker, run_labels, busybox):
+    """
+    factory creating containers that are force removed when the test finishes, however it finishes. takes the
+    same arguments as Containers.create, defaulting the image and run labels, pass start=True to start it too
+    :return:
+    """
+    created = []
+
+    def _make(start=False, **kwargs):
+        kwargs.setdefault("image", busybox)
+        kwargs["labels"] = {**run_labels, **kwargs.get("labels", {})}
+        c = docker.containers().create(**kwargs)
+        created.append(c)
+        if start:
+            c.start()
+        return c
+
+    yield _make
+    remove_all(created)
+
+
+@pytest.fixture(scope="module")
+def pool():
+    """a thread pool shared by the concurrency tests in a module"""
+    with ThreadPoolExecutor(max_workers=5) as p:
+        yield p
+
+
+@pytest.fixture(scope="module")
+def sleeper(docker, run_labels, busybox):
+    """
+    one long running container per module, shared by tests that only exec in it, read or write files inside it
+    or otherwise leave it running
+    :return:
+    """
+    c = docker.containers().run(image=busybox, name=unique_prefix() + "sleeper", command=['sleep', '3600'], labels=run_labels)
+    yield c
+    c.remove(force=True)
+
+
+@pytest.fixture(scope="session")
+def image_pull(busybox):
+    """busybox is present locally, pulled at most once per session by prewarm_images"""
+    return busybox
+
+
+
+@pytest.fixture
+def running_container(docker, run_labels, busybox):
+    container = docker.containers().create(image=busybox,name=unique_prefix() + "busybox",labels=run_labels)
     yield container
     container.delete()
     
 
-@pytest.fixture
-def running_network():
-    docker_pyo3.Docker().networks().create(name="test_network")
-    n = docker_pyo3.Docker().networks().get("test_network")
+@pytest.fixture(scope="module")
+def running_network(docker, run_labels):
+    """
+    one network per module, tests using it only read it or connect and disconnect again
+    :return:
+    """
+    n = docker.networks().create(name=unique_prefix() + "test_network", labels=run_labels)
     yield n
     n.delete()
\ No newline at end of file
@@ -1,28 +1,185 @@
-from docker_pyo3 import Docker
+import http.server
+import json
+import multiprocessing
+import os
+import threading
 
+import pytest
+from docker_pyo3 import Docker, DockerError, NotFoundError
+from docker_pyo3.image import RegistryAuth
 
-def test_client_init():
+
+@pytest.fixture(scope="module")
+def client():
+    """a client for tests that never talk to the daemon, so they run without one"""
+    return Docker()
+
+
+def test_client_init(client):
     """ client has expected methods&attrs"""
-    d = Docker()
-    assert isinstance(d,Docker)
+    assert isinstance(client,Docker)
+    expected = {"containers", "images", "networks", "volumes"}
+    attrs = set(dir(client))
+    assert expected <= attrs, f"missing: {expected - attrs}"
+
+
+@pytest.mark.parametrize("method", ["version", "info", "ping", "data_usage"])
+def test_client_getters(docker, method):
+    """ client getters return dicts"""
+    assert isinstance(getattr(docker,method)(),dict)
+
+
+def test_client_version_cached():
+    """ version is fetched once and served from the client afterwards, even once the daemon is gone"""
+    hits = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            body = json.dumps({"Version": "24.0.0", "ApiVersion": "1.43"}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = Docker(f"tcp://127.0.0.1:{server.server_port}")
+    try:
+        first = client.version()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert first["Version"] == "24.0.0"
+    # nothing is listening any more, an uncached client would raise here
+    assert client.version() == first
+    assert len(hits) == 1
+
+
+def test_client_version_error_not_cached():
+    """ a failed version lookup is retried rather than remembered"""
+    unreachable = Docker("tcp://127.0.0.1:1")
+    for _ in range(2):
+        with pytest.raises(DockerError):
+            unreachable.version()
+
+
+def _ping():
+    return isinstance(Docker().ping(), dict)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_client_after_fork(docker):
+    """ a forked child builds its own runtime instead of hanging on the parent's"""
+    docker.ping()
+    with multiprocessing.get_context("fork").Pool(1) as pool:
+        assert pool.apply_async(_ping).get(timeout=30)
+
+
+def test_docker_error():
+    """ daemon failures raise DockerError, which is still a SystemError"""
+    assert issubclass(DockerError, SystemError)
+    with pytest.raises(DockerError):
+        Docker("tcp://127.0.0.1:1").ping()
+
+
+def test_client_invalid_uri():
+    """ a uri the client can't use is rejected at construction, without a daemon"""
+    with pytest.raises(ValueError, match="Invalid docker uri"):
+        Docker("ftp://127.0.0.1")
+
+
+def test_not_found_error(docker, name_prefix):
+    """ a missing object raises NotFoundError, which is still a DockerError"""
+    assert issubclass(NotFoundError, DockerError)
+    with pytest.raises(NotFoundError):
+        docker.volumes().get(name_prefix + "missing").inspect()
+    missing = docker.containers().get(name_prefix + "missing")
+    for call in (missing.remove, missing.inspect, missing.start, missing.pause, missing.logs):
+        with pytest.raises(NotFoundError):
+            call()
+
+
+def test_client_prepare_auth(client):
+    """ auth can be parsed once and reused"""
+    auth = client.prepare_auth(auth_password=dict(username="user", password="password"))
+    assert isinstance(auth, RegistryAuth)
+
+
+@pytest.mark.parametrize("kwargs", [
+    dict(auth_password=dict(username="user"), auth_token=dict(identity_token="token")),
+    dict(auth_token=dict()),
+])
+def test_client_prepare_auth_invalid(client, kwargs):
+    """ malformed auth arguments are rejected without contacting the daemon"""
+    with pytest.raises(ValueError):
+        client.prepare_auth(**kwargs)
+
+
+def test_client_accessors_cached(client):
+    """ collection accessors are built once per client"""
+    assert client.containers() is client.containers()
+    assert client.images() is client.images()
+    assert client.networks() is client.networks()
+    assert client.volumes() is client.volumes()
+
+
+def test_client_health_check(docker, docker_health):
+    """ health check reports a reachable daemon"""
+    hc = docker_health
+    assert hc["healthy"] is True
+    assert hc["error"] is None
+    assert isinstance(hc["version"], dict)
+    assert isinstance(hc["info"], dict)
+
+
+def test_batch_inspect(docker, sleeper, busybox, name_prefix):
+    """several lookups go out in one call and failures come back in place"""
+    missing = name_prefix + "missing"
+    results = docker.batch_inspect([
+        ("container", sleeper.id()),
+        ("image", busybox),
+        ("container", missing),
+        ("network", missing),
+        ("volume", missing),
+    ])
+    assert results[0]["Id"] == sleeper.id()
+    assert "Id" in results[1]
+    assert all(isinstance(r, NotFoundError) for r in results[2:])
+
+
+def test_batch_inspect_bad_kind(client):
+    """unknown kinds are rejected up front"""
+    with pytest.raises(ValueError, match="Unknown kind"):
+        client.batch_inspect([("spaceship", "x")])
+
 
-    interface_methods = [
-        "containers",
-        "images",
-        "networks",
-        "volumes"
-    ]
+def test_client_system_snapshot(docker):
+    """ version, info and ping come back from one call"""
+    snap = docker.system_snapshot()
+    assert isinstance(snap["version"], dict)
+    assert isinstance(snap["info"], dict)
+    assert isinstance(snap["ping"], dict)
 
-    for m in interface_methods:
-        assert hasattr(d,m) and callable(getattr(d,m))
 
-    gettr_methods = [
-        "version",
-        "info",
-        "ping",
-        "data_usage"
-    ]
+def test_docker_cleanup(docker, make_container, name_prefix):
+    """cleanup removes containers, networks and volumes by name prefix"""
+    prefix = name_prefix + "cleanup-"
+    make_container(name=prefix + "container", command=["sleep", "300"], start=True)
+    docker.networks().create(name=prefix + "network")
+    docker.volumes().create(name=prefix + "volume")
+    report = docker.cleanup(prefix)
+    assert len(report["containers"]) == 1
+    assert report["networks"] == [prefix + "network"]
+    assert report["volumes"] == [prefix + "volume"]
+    assert docker.cleanup(prefix) == {"containers": [], "networks": [], "volumes": []}
 
-    for gm in gettr_methods:
-        assert isinstance(getattr(d,gm)(),dict)
 
+def test_docker_cleanup_empty_prefix(client):
+    """an empty prefix would match everything and is refused"""
+    with pytest.raises(ValueError):
+        client.cleanup("")
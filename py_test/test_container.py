@@ -1,8 +1,43 @@
+from docker_pyo3 import DockerError, NotFoundError
 from docker_pyo3.container import Containers,Container
 import datetime
+import os
+import random
+import uuid
+from types import MappingProxyType
 import pytest
 
 
+@pytest.fixture
+def wait_state(wait_for):
+    """
+    wait until the dotted `path` (e.g. "State.Running") of inspect() equals `expected`, `expected` may also be a
+    predicate on the value. returns the matching inspect() payload so callers can assert on other fields without
+    inspecting again
+    """
+    def _wait(container, path, expected, timeout=5.0):
+        last = None
+
+        def check():
+            nonlocal last
+            info = container.inspect()
+            last = info
+            for key in path.split("."):
+                last = last[key]
+            return info if (expected(last) if callable(expected) else last == expected) else None
+
+        try:
+            return wait_for(check, timeout=timeout, interval=0.1)
+        except TimeoutError:
+            raise TimeoutError(f"{path} never reached {expected!r}, last saw {last!r}") from None
+
+    return _wait
+
+
+@pytest.fixture
+def sleeping_container(make_container, name_prefix):
+    return make_container(name=name_prefix + "lifecycle", command=['sleep', '300'])
+
 
 def test_containers(docker):
     """containers is a containers instance"""
@@ -13,17 +48,144 @@ def test_containers_list(docker):
     assert isinstance(docker.containers().list(all=True), list)
 
 
-def test_create_container(docker, image_pull):
+def test_create_container(docker, image_pull, busybox, name_prefix):
     """ we can create/delete a container"""
-    c = docker.containers().create(image='busybox',name='weee')
+    c = docker.containers().create(image=busybox,name=name_prefix + "weee")
     c.delete()
     pass
     
+def test_create_container_restart_policy_and_ports(make_container, name_prefix):
+    """restart policies and port mappings are passed to the daemon"""
+    c = make_container(
+        name=name_prefix + "ports",
+        restart_policy={"name": "on-failure", "maximum_retry_count": 3},
+        publish=["18080:80/tcp", "53/udp"],
+    )
+    host_config = c.inspect()["HostConfig"]
+    assert host_config["RestartPolicy"] == {"Name": "on-failure", "MaximumRetryCount": 3}
+    assert host_config["PortBindings"]["80/tcp"][0]["HostPort"] == "18080"
+
+def test_create_container_invalid_restart_policy(docker, busybox):
+    """bad restart policies are rejected before reaching the daemon"""
+    with pytest.raises(ValueError, match="Invalid restart policy"):
+        docker.containers().create(image=busybox, restart_policy={"name": "sometimes"})
+
+@pytest.mark.parametrize("spec", ["80:http", "eighty", "80/sctp", "1:2:3"])
+def test_create_container_invalid_port(docker, spec, busybox):
+    """bad port mappings are rejected before reaching the daemon"""
+    with pytest.raises(ValueError, match="Invalid port mapping format"):
+        docker.containers().create(image=busybox, publish=[spec])
+
+def test_containers_run(docker, busybox, name_prefix):
+    """we can create and start a container in one call"""
+    c = docker.containers().run(image=busybox, name=name_prefix + "run", command=['sleep', '300'])
+    try:
+        assert isinstance(c, Container)
+        c.wait_until_running()
+    finally:
+        c.remove(force=True)
+
+def test_containers_run_attached(docker, busybox, name_prefix):
+    """an attached run returns the output and can remove the container afterwards"""
+    name = name_prefix + "run-attached"
+    out = docker.containers().run(image=busybox, name=name, command=['echo', 'test'], detach=False, remove=True)
+    assert out == "test\n"
+    assert docker.containers().list(all=True, filters={"name": name}) == []
+
+def test_containers_run_attached_failure(docker, busybox, name_prefix):
+    """a failing attached run raises with its exit status and output, and is still removed"""
+    name = name_prefix + "run-failed"
+    with pytest.raises(DockerError, match="status 3: boom"):
+        docker.containers().run(image=busybox, name=name, command=['sh', '-c', 'echo boom; exit 3'],
+                                detach=False, remove=True)
+    assert docker.containers().list(all=True, filters={"name": name}) == []
+
+def test_containers_run_bad_kwarg(docker, busybox):
+    """run only takes create's keyword arguments"""
+    with pytest.raises(TypeError, match="unexpected keyword argument"):
+        docker.containers().run(image=busybox, colour="red")
+
 def test_containers_list(running_container,docker):
     """we can list container"""
     x = docker.containers().list(since='30s',sized=True, all=True)
     assert isinstance(x, list)
 
+def test_containers_list_filters(docker, make_container, name_prefix):
+    """we can filter the container list by label, name and id"""
+    name = name_prefix + "filtered"
+    c = make_container(name=name, labels={"flavour": name})
+    by_label = docker.containers().list(all=True, filters={"label": f"flavour={name}"})
+    assert [x["Id"] for x in by_label] == [c.id()]
+    assert by_label[0]["Labels"]["flavour"] == name
+    by_name = docker.containers().list(all=True, filters={"name": name})
+    assert [x["Id"] for x in by_name] == [c.id()]
+    by_id = docker.containers().list(all=True, filters={"id": [c.id()], "label": "flavour"})
+    assert [x["Id"] for x in by_id] == [c.id()]
+
+def _many_kv(n):
+    rng = random.Random(n)
+    return MappingProxyType({f"KEY_{i}": f"value_{rng.getrandbits(32):08x}" for i in range(n)})
+
+
+# built once at import, read-only so no test can leak changes into another parametrization
+_MANY_KV = {n: _many_kv(n) for n in (1, 10, 100)}
+_MANY_ENV = {n: tuple(f"{k}={v}" for k, v in pairs.items()) for n, pairs in _MANY_KV.items()}
+
+
+@pytest.mark.parametrize("kind", ["env", "labels"])
+@pytest.mark.parametrize("n", sorted(_MANY_KV))
+def test_container_many_kv(make_container, name_prefix, kind, n):
+    """n environment variables or labels all reach the container"""
+    pairs = _MANY_KV[n]
+    if kind == "env":
+        info = make_container(name=name_prefix + "env", env=list(_MANY_ENV[n])).inspect()
+        env = dict(e.split("=", 1) for e in info["Config"]["Env"])
+        assert pairs.items() <= env.items()
+    else:
+        info = make_container(name=name_prefix + "labels", labels=dict(pairs)).inspect()
+        assert pairs.items() <= info["Config"]["Labels"].items()
+
+def test_container_with_unicode_environment(make_container, name_prefix):
+    """non-ascii environment values round trip unchanged"""
+    info = make_container(
+        name=name_prefix + "unicode-env",
+        env=["GREETING=Hello 世界", "EMOJI=🐳 Docker", "SPECIAL=Ñoño", "EQUALS=a=b"],
+    ).inspect()
+    env = dict(e.split("=", 1) for e in info["Config"]["Env"])
+    assert env["GREETING"] == "Hello 世界"
+    assert env["EMOJI"] == "🐳 Docker"
+    assert env["SPECIAL"] == "Ñoño"
+    assert env["EQUALS"] == "a=b"
+
+def test_container_create_duplicate_name(docker, make_container, busybox, name_prefix):
+    """creating a second container under a taken name fails"""
+    name = name_prefix + "duplicate-name"
+    make_container(name=name)
+    with pytest.raises(DockerError, match="(?i)already in use"):
+        docker.containers().create(image=busybox, name=name)
+
+def test_containers_list_bad_filter(docker):
+    """unknown filter keys are rejected"""
+    with pytest.raises(ValueError, match="Unsupported container filter"):
+        docker.containers().list(filters={"colour": "red"})
+
+def test_containers_prune_by_label(docker, make_container, name_prefix, pool):
+    """prune only removes stopped containers matching the filter"""
+    label = f"prune-me={name_prefix}"
+
+    def stopped(i):
+        c = make_container(name=f"{name_prefix}prune{i}", command=["true"], labels={"prune-me": name_prefix}, start=True)
+        c.wait()
+        return c
+
+    # create, start and wait overlap across the pool instead of paying each round trip in turn
+    pruned = list(pool.map(stopped, range(5)))
+    keep = make_container(name=name_prefix + "keep")
+    rv = docker.containers().prune(filters={"label": label})
+    assert set(rv["ContainersDeleted"]) == {c.id() for c in pruned}
+    assert docker.containers().list(all=True, filters={"label": label}) == []
+    assert len(docker.containers().list(all=True, filters={"id": keep.id()})) == 1
+
 def test_containers_get(running_container):
     """we can get a container"""
     assert isinstance(running_container,Container)
@@ -34,9 +196,152 @@ def test_container_logs(running_container):
     logs = running_container.logs(stdout=True, stderr=True, timestamps=True, since=since)
     assert isinstance(logs, str)
     
-def test_container_inspect(docker, running_container):
+def test_container_logs_callback(make_container):
+    """a long log can be consumed chunk by chunk without holding it all at once"""
+    c = make_container(command=["sh", "-c", "for i in $(seq 1000); do echo line$i; done"], start=True)
+    c.wait()
+    seen = {"lines": 0, "first": None, "tail": b""}
+
+    def on_chunk(chunk):
+        seen["lines"] += chunk.count(b"\n")
+        buf = seen["tail"] + chunk
+        if seen["first"] is None and b"\n" in buf:
+            seen["first"] = buf.split(b"\n", 1)[0]
+        # only the unfinished line is carried over to the next chunk
+        seen["tail"] = buf.rsplit(b"\n", 1)[-1]
+
+    assert c.logs(stdout=True, callback=on_chunk) == ""
+    assert seen["lines"] == 1000
+    assert seen["first"] == b"line1"
+    assert seen["tail"] == b""
+
+def test_container_logs_callback_reentrant(make_container):
+    """a log callback may call back into the binding while the log is still streaming"""
+    c = make_container(command=["echo", "hello"], start=True)
+    c.wait()
+    states = []
+    c.logs(stdout=True, callback=lambda chunk: states.append(c.inspect()["State"]["Status"]))
+    assert states and set(states) == {"exited"}
+
+def test_container_logs_callback_removed(make_container):
+    """a failing log stream raises instead of quietly returning nothing"""
+    c = make_container(command=["true"])
+    c.remove(force=True)
+    with pytest.raises(NotFoundError):
+        c.logs(stdout=True, callback=lambda chunk: None)
+
+def test_container_wait_removed(make_container):
+    """waiting on a container that no longer exists raises rather than crashing"""
+    c = make_container(command=["true"])
+    c.remove(force=True)
+    with pytest.raises(DockerError):
+        c.wait()
+
+def test_multiple_clients_same_container(docker_alt, sleeper):
+    """a second client sees the same container"""
+    info = sleeper.inspect()
+    other = docker_alt.containers().get(sleeper.id()).inspect()
+    fields = ("Id", "Name", "Created")
+    assert [other[f] for f in fields] == [info[f] for f in fields]
+
+def test_container_inspect(running_container):
     """we can inspect a container"""
     assert isinstance(running_container.inspect(),dict)
-    
 
-    
\ No newline at end of file
+
+def test_container_start_stop(sleeping_container, wait_state):
+    """we can start and stop a container"""
+    sleeping_container.start()
+    sleeping_container.wait_until_running()
+    sleeping_container.stop(wait=datetime.timedelta(seconds=1))
+    wait_state(sleeping_container, "State.Running", False)
+
+def test_container_pause_unpause(sleeping_container, wait_state):
+    """we can pause and unpause a container"""
+    sleeping_container.start()
+    sleeping_container.wait_until_running()
+    sleeping_container.pause()
+    info = wait_state(sleeping_container, "State.Paused", True)
+    assert info["State"]["Running"] is True
+    assert info["State"]["Status"] == "paused"
+    sleeping_container.unpause()
+    info = wait_state(sleeping_container, "State.Paused", False)
+    assert info["State"]["Running"] is True
+    assert info["State"]["Status"] == "running"
+
+def test_container_restart(sleeping_container, wait_state):
+    """we can restart a container"""
+    sleeping_container.start()
+    started_at = wait_state(sleeping_container, "State.Running", True)["State"]["StartedAt"]
+    sleeping_container.restart(wait=datetime.timedelta(seconds=1))
+    wait_state(sleeping_container, "State", lambda st: st["Running"] and st["StartedAt"] != started_at)
+
+def test_container_kill(sleeping_container, wait_state):
+    """we can kill a container"""
+    sleeping_container.start()
+    sleeping_container.wait_until_running()
+    sleeping_container.kill()
+    wait_state(sleeping_container, "State.Running", False)
+
+def test_container_wait_until_running_timeout(sleeping_container):
+    """waiting on a container that is never started times out"""
+    with pytest.raises(TimeoutError, match="not running after 100ms"):
+        sleeping_container.wait_until_running(timeout_ms=100)
+
+def test_container_events(docker, sleeping_container, wait_for):
+    """container state changes show up in the event stream"""
+    since = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=1)
+    sleeping_container.start()
+    sleeping_container.kill()
+    # the daemon may publish the events a moment after the state change, poll for them instead of sleeping
+    expected = {"start", "kill", "die"}
+    wait_for(lambda: expected <= {e["Action"] for e in docker.events(since=since, container=sleeping_container.id())})
+
+def test_container_remove(docker, run_labels, busybox, name_prefix):
+    """we can force remove a running container in one call"""
+    c = docker.containers().run(image=busybox, name=name_prefix + "remove", command=['sleep', '300'], labels=run_labels)
+    c.wait_until_running()
+    c.remove(force=True)
+    assert docker.containers().list(all=True, filters={"id": c.id()}) == []
+
+def test_container_exec(sleeper):
+    """several commands run through one exec round trip"""
+    out = sleeper.exec(command=["sh", "-c", "; ".join(f"echo test{i}" for i in range(3))], attach_stdout=True)
+    assert out.split() == ["test0", "test1", "test2"]
+
+def test_container_exec_bad_command(sleeper):
+    """a command that isn't a list of strings is a TypeError, not a crash"""
+    with pytest.raises(TypeError):
+        sleeper.exec(command=["echo", 1])
+
+def test_container_copy_file_into(sleeper, tmp_path):
+    """we can copy a file into a container"""
+    src = tmp_path / "hello.txt"
+    src.write_bytes(b"hello")
+    dst = f"/tmp/{uuid.uuid4().hex}.txt"
+    sleeper.copy_file_into(str(src), dst)
+    assert sleeper.stat_file(dst)
+
+def test_container_copy_file_into_missing(sleeper, tmp_path):
+    """a missing source file raises FileNotFoundError rather than crashing"""
+    with pytest.raises(FileNotFoundError):
+        sleeper.copy_file_into(str(tmp_path / "missing.txt"), "/tmp/missing.txt")
+
+def test_container_stat_file(sleeper):
+    """we can stat a file in a container"""
+    assert isinstance(sleeper.stat_file("/bin/sh"), str)
+
+def test_container_copy_from(sleeper, tmp_path):
+    """we can copy a file out of a container"""
+    sleeper.copy_from("/etc/hostname", str(tmp_path))
+    assert (tmp_path / "hostname").exists()
+
+def test_container_copy_round_trip(sleeper, tmp_path):
+    """a 1 MiB file comes back out of a container byte for byte"""
+    payload = os.urandom(1024 * 1024)
+    src = tmp_path / "in.dat"
+    src.write_bytes(payload)
+    name = f"{uuid.uuid4().hex}.dat"
+    sleeper.copy_file_into(str(src), f"/tmp/{name}")
+    sleeper.copy_from(f"/tmp/{name}", str(tmp_path))
+    assert (tmp_path / name).read_bytes() == payload
@@ -1,11 +1,22 @@
 import docker_pyo3
+from docker_pyo3 import DockerError
 from docker_pyo3.image import Images,Image
+import concurrent.futures
+import io
 import pytest
-import os
+import queue
+import re
+import tarfile
 # Images Endpoints
 
 
-here = os.path.abspath(os.path.dirname(__file__))
+_AUTH_ERR_RE = re.compile(r"unauthorized|incorrect|auth|password|denied|forbidden|credential", re.I)
+
+
+def _has_member(fileobj, name):
+    """stream the tar headers and stop at the first member called `name`"""
+    with tarfile.open(fileobj=fileobj, mode="r|") as tar:
+        return any(member.name == name for member in tar)
 
 def test_images_init(docker):
     """images collection accessor"""
@@ -18,11 +29,32 @@ def test_images_pull(docker):
     x = docker.images().pull(image='busybox')
     assert isinstance(x,list)
 
+def test_images_pull_callback(docker):
+    """pull progress can be consumed as it arrives"""
+    frames = []
+    x = docker.images().pull(image='busybox', callback=frames.append)
+    assert x is None
+    assert len(frames) > 0
+    assert all(isinstance(f, dict) for f in frames)
+
+def test_images_pull_prepared_auth(docker):
+    """pull an image with credentials prepared up front"""
+    auth = docker.prepare_auth()
+    x = docker.images().pull(image='busybox', auth=auth)
+    assert isinstance(x,list)
+
 def test_images_pull_bad(docker):
-    """pulling a bad image fails with SystemError"""
-    with pytest.raises(SystemError):
+    """pulling a bad image fails with DockerError"""
+    with pytest.raises(DockerError):
         docker.images().pull(image="asldfkjasd;lfk")
 
+def test_images_pull_bad_auth(docker):
+    """pulling with bad credentials fails with an auth error"""
+    auth = docker.prepare_auth(auth_password=dict(username="docker-pyo3", password="not-a-password"))
+    with pytest.raises(DockerError) as e:
+        docker.images().pull(image="busybox", auth=auth)
+    assert _AUTH_ERR_RE.search(str(e.value))
+
 def test_images_list(docker, image_pull):
     """we can list images"""
     local_images = docker.images().list()
@@ -37,22 +69,47 @@ def test_images_prune(image_pull,docker):
     docker.images().prune()
     pass
 
-def test_images_build(docker):
-    """ we can build an image"""
+@pytest.fixture(scope="session")
+def build_context(tmp_path_factory):
+    """a build context written once and shared, identical contexts also let the daemon reuse its build cache"""
+    d = tmp_path_factory.mktemp("build-context")
+    (d / 'Dockerfile').write_bytes(b"FROM busybox\nCOPY hello.txt /\n")
+    (d / 'hello.txt').write_bytes(b"hello")
+    return d
 
-    path =  os.path.join(here,'Dockerfile')
-
-    with open(path,'w') as f:
-        print("FROM busybox",file=f)
-        print("COPY conftest.py /", file=f)
-
-    try:
-        x = docker.images().build(path=here,dockerfile='Dockerfile',tag='test-image')
-    except Exception as e:
-        raise(e)
-    finally:
-        os.unlink(path)
-        docker.images().get('test-image').delete()
+def test_images_build(docker, run_labels, build_context, name_prefix):
+    """ we can build an image"""
+    tag = name_prefix + "test-image"
+
+    x = docker.images().build(path=str(build_context),dockerfile='Dockerfile',tag=tag,labels=run_labels)
+    assert run_labels.items() <= docker.images().get(tag).inspect()["Config"]["Labels"].items()
+
+def test_images_build_callback(docker, run_labels, build_context, name_prefix):
+    """build progress can be consumed as it arrives"""
+    frames = []
+    x = docker.images().build(path=str(build_context), tag=name_prefix + "test-image-cb", labels=run_labels,
+                              callback=frames.append)
+    assert x is None
+    assert len(frames) > 0
+    assert all(isinstance(f, dict) for f in frames)
+
+def test_images_build_cache(docker, run_labels, build_context, name_prefix):
+    """rebuilding an unchanged context reuses the cached image, nocache forces a fresh one"""
+    tag = name_prefix + "test-image-cache"
+
+    def build(**kwargs):
+        docker.images().build(path=str(build_context), tag=tag, labels=run_labels, **kwargs)
+        return docker.images().get(tag).inspect()["Id"]
+
+    first = build()
+    assert build() == first
+    assert build(nocache=True) != first
+
+@pytest.mark.parametrize("filters", [{"reference": "busybox"}, {"dangling": "maybe"}])
+def test_images_prune_bad_filter(docker, filters):
+    """unsupported image prune filters are rejected before reaching the daemon"""
+    with pytest.raises(ValueError, match="Unsupported image prune filter"):
+        docker.images().prune(filters=filters)
 
 def test_images_get(image_pull, docker):
     """we can get and inspect images by Id and name"""
@@ -71,18 +128,29 @@ def test_images_get_bad(docker):
     """non existent image interface fails"""
     
     image = docker.images().get("DSDFLKJ")
-    with pytest.raises(SystemError):
+    with pytest.raises(DockerError):
         image.inspect()
         
 
 
+def test_images_concurrent_errors(docker, pool, name_prefix):
+    """failed lookups from several threads each raise DockerError"""
+    errors = queue.SimpleQueue()
+
+    def invalid_operation(i):
+        try:
+            docker.images().get(f"{name_prefix}missing-{i}").inspect()
+        except DockerError as e:
+            errors.put(e)
+
+    concurrent.futures.wait([pool.submit(invalid_operation, i) for i in range(5)])
+    assert errors.qsize() == 5
+
+
 def test_image_name(docker, image_pull):
     """images have a name"""
-    try:
-        image = docker.images().get('busybox')
-        assert image.name() == 'busybox'
-    except Exception as e:
-        raise e
+    image = docker.images().get('busybox')
+    assert image.name() == 'busybox'
 
 
 
@@ -98,30 +166,36 @@ def test_image_name(docker, image_pull):
 #         raise e
         
 
-def test_image_export(docker, image_pull):
+def test_image_export(docker, image_pull, tmp_path):
     """we can export images"""
-    
-    
-    try:
-        image = docker.images().get('busybox')
-        image.export(path="busybox.tar")
-        assert os.path.exists("busybox.tar")
-    except Exception as e:
-        raise e
-    finally: 
-        os.unlink("busybox.tar")
+    target = tmp_path / "busybox.tar"
+    image = docker.images().get('busybox')
+    written = image.export(path=str(target))
+    assert int(written) == target.stat().st_size
+    with open(target, "rb") as f:
+        assert _has_member(f, "manifest.json")
+
+def test_image_export_bad_path(docker, image_pull, tmp_path):
+    """a target the client can't write to is a local OSError, not a daemon error"""
+    image = docker.images().get('busybox')
+    with pytest.raises(OSError):
+        image.export(path=str(tmp_path / "missing" / "busybox.tar"))
+
+def test_image_export_bytes(docker, image_pull):
+    """we can export images straight into memory"""
+    image = docker.images().get('busybox')
+    assert _has_member(io.BytesIO(image.export_bytes()), "manifest.json")
 
     
-def test_image_tag(docker, image_pull):
+def test_image_tag(docker, image_pull, teardown_registry, name_prefix):
     """we can tag images"""
     
-    try:
-        image = docker.images().get('busybox')    
-        image.tag("test_tag")
-    except Exception as e:
-        raise e
-    finally:
-        docker.images().get("test_tag").delete()
+    image = docker.images().get('busybox')    
+    tag = name_prefix + "test_tag"
+    image.tag(tag)
+    teardown_registry.track_image(tag)
+    original, tagged = docker.images().inspect_many(['busybox', tag])
+    assert original['Id'] == tagged['Id']
 
     
 
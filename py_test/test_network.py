@@ -8,33 +8,41 @@ def test_networks(docker):
     assert isinstance(docker.networks(), Networks)
 
 
-def test_networks_create(docker):
+def test_networks_create(docker, name_prefix):
     """we can create a network"""
-    try:
-        docker.networks().create(name="test_network")
-        n = docker.networks().get("test_network")
-        assert isinstance(n,Network)
-    except Exception as e:
-        raise e
-    finally:
-        n.delete()
+    name = name_prefix + "test_networks_create"
+    assert not docker.networks().exists(name)
+    docker.networks().create(name=name)
+    assert docker.networks().exists(name)
+    n = docker.networks().get(name)
+    assert isinstance(n,Network)
 
 
-def test_networks_list(docker):
+def test_networks_list(docker, name_prefix):
     """we can list network"""
-    try:
-        n = docker.networks().create(name="test_network")
-        ns = docker.networks().list()
-        assert isinstance(ns, list)
-        assert len(ns) > 0
-    except Exception as e:
-        raise e
-    finally:
-        n.delete()
-
-def test_networks_prune(docker):
-    """we can prune networks"""
-    docker.networks().prune()
+    docker.networks().create(name=name_prefix + "test_networks_list")
+    ns = docker.networks().list()
+    assert isinstance(ns, list)
+    assert len(ns) > 0
+
+def test_networks_prune(docker, name_prefix):
+    """we can prune networks, filtered to this test's label so networks other tests are using survive"""
+    assert isinstance(docker.networks().prune(filters={"label": f"prune-me={name_prefix}"}), dict)
+
+def test_networks_prune_filters(docker, name_prefix):
+    """we can prune only the networks carrying a label"""
+    keep, drop = name_prefix + "keep", name_prefix + "drop"
+    docker.networks().create(name=keep)
+    docker.networks().create(name=drop, labels={"prune-me": name_prefix})
+    docker.networks().prune(filters={"label": f"prune-me={name_prefix}"})
+    assert not docker.networks().exists(drop)
+    assert docker.networks().exists(keep)
+
+@pytest.mark.parametrize("filters", [{"name": "x"}, {"dangling": "true"}])
+def test_networks_prune_bad_filter(docker, filters):
+    """filters the daemon does not support for networks are rejected before reaching it"""
+    with pytest.raises(ValueError, match="Unsupported network prune filter"):
+        docker.networks().prune(filters=filters)
 
 def test_network_id(running_network):
     """networks have an id"""
@@ -44,7 +52,7 @@ def test_network_inspect(running_network):
     """we can inspect the network"""
     running_network.inspect()
     
-def test_network_connect(running_network, running_container):
+def test_network_connect(running_network, sleeper):
     """ we can connect and disconnect from network"""
-    running_network.connect(running_container.id())
-    running_network.disconnect(running_container.id())
\ No newline at end of file
+    running_network.connect(sleeper.id())
+    running_network.disconnect(sleeper.id())
\ No newline at end of file
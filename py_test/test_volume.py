@@ -1,3 +1,4 @@
+from docker_pyo3 import DockerError
 from docker_pyo3.volume import Volumes,Volume
 import datetime
 import pytest
@@ -7,23 +8,48 @@ def test_volumes(docker):
     """volumes interface exists"""
     assert isinstance(docker.volumes(), Volumes)
 
-def test_volumes(docker):
+def test_volumes_list(docker, name_prefix):
     """we can list volumes"""
-    docker.volumes().create(name="test_volumes")
+    name = name_prefix + "test_volumes"
+    docker.volumes().create(name=name)
     vs = docker.volumes().list()
     assert isinstance(vs, dict)
 
-def test_volumes_create(docker):
+def test_volumes_create(docker, name_prefix):
     """we can create&delete volumes"""
-    docker.volumes().create(name="test_volumes")
-    v = docker.volumes().get("test_volumes")
+    name = name_prefix + "test_volumes"
+    docker.volumes().create(name=name)
+    assert docker.volumes().exists(name)
+    v = docker.volumes().get(name)
     assert isinstance(v, Volume)
     v.delete()
+    assert not docker.volumes().exists(name)
 
-def test_volume_inspect(docker):
+def test_volume_inspect(docker, name_prefix):
     """we can inspect a volume"""
-    docker.volumes().create(name="test_volumes")
-    v = docker.volumes().get("test_volumes")
+    name = name_prefix + "test_volumes"
+    docker.volumes().create(name=name)
+    v = docker.volumes().get(name)
     v.inspect()
     assert isinstance(v, Volume)
-    v.delete()
\ No newline at end of file
+
+@pytest.mark.parametrize("name", ["a", "-leading-dash", ".hidden", "has space", "has/slash", "ünïcode"])
+def test_volumes_create_invalid_name(docker, name):
+    """invalid volume names are rejected before reaching the daemon"""
+    with pytest.raises(ValueError, match="Invalid volume name"):
+        docker.volumes().create(name=name)
+    with pytest.raises(ValueError, match="Invalid volume name"):
+        docker.volumes().create(name=name, driver="local")
+
+def test_volumes_create_anonymous(docker):
+    """an empty name is left to the daemon, which creates the volume under a generated name"""
+    v = docker.volumes().create(name="")
+    try:
+        assert v["Name"]
+    finally:
+        docker.volumes().get(v["Name"]).delete()
+
+def test_volumes_create_plugin_name_not_validated(docker, name_prefix):
+    """names for other drivers are left to the plugin, so the daemon answers instead of the local check"""
+    with pytest.raises(DockerError):
+        docker.volumes().create(name=name_prefix + "has space", driver=name_prefix + "no-such-plugin")
@@ -1,19 +1,20 @@
 use chrono::{DateTime, Utc};
-use docker_api::conn::TtyChunk;
 use docker_api::models::{
     ContainerInspect200Response, ContainerPrune200Response, ContainerSummary, ContainerWaitResponse,
 };
 use docker_api::opts::{
-    ContainerCreateOpts, ContainerListOpts, ContainerPruneOpts, ExecCreateOpts, LogsOpts,
+    ContainerCreateOpts, ContainerFilter, ContainerListOpts, ContainerPruneFilter,
+    ContainerPruneOpts, ContainerRemoveOpts, ExecCreateOpts, LogsOpts, PublishPort,
 };
 use docker_api::{Container, Containers};
 use futures_util::stream::StreamExt;
 use futures_util::TryStreamExt;
 use pyo3::exceptions;
 use pyo3::prelude::*;
-use pyo3::types::{PyDateTime, PyDelta, PyDict, PyList};
+use pyo3::types::{PyBytes, PyDateTime, PyDelta, PyDict, PyList};
 use pythonize::pythonize;
-use std::{fs::File, io::Read};
+use std::collections::HashMap;
+use std::time::Duration;
 use tar::Archive;
 
 use crate::Pyo3Docker;
@@ -47,10 +48,11 @@ impl Pyo3Containers {
     fn list(
         &self,
         all: Option<bool>,
-        since: Option<String>,
-        before: Option<String>,
+        since: Option<&str>,
+        before: Option<&str>,
         sized: Option<bool>,
-    ) -> Py<PyAny> {
+        filters: Option<&PyDict>,
+    ) -> PyResult<Py<PyAny>> {
         let mut builder = ContainerListOpts::builder();
 
         bo_setter!(all, builder);
@@ -58,12 +60,24 @@ impl Pyo3Containers {
         bo_setter!(before, builder);
         bo_setter!(sized, builder);
 
-        let cs = __containers_list(&self.0, &builder.build());
-        pythonize_this!(cs)
+        if let Some(filters) = filters {
+            builder = builder.filter(__container_filters(filters)?);
+        }
+
+        match __containers_list(&self.0, &builder.build()) {
+            Ok(cs) => Ok(pythonize_this!(cs)),
+            Err(e) => Err(py_sys_exception!(e)),
+        }
     }
 
-    fn prune(&self) -> PyResult<Py<PyAny>> {
-        let rv = __containers_prune(&self.0, &Default::default());
+    /// Remove stopped containers, optionally only those matching `{"label": ..., "until": ...}`.
+    fn prune(&self, filters: Option<&PyDict>) -> PyResult<Py<PyAny>> {
+        let mut opts = ContainerPruneOpts::builder();
+        if let Some(filters) = filters {
+            opts = opts.filter(__container_prune_filters(filters)?);
+        }
+
+        let rv = __containers_prune(&self.0, &opts.build());
 
         match rv {
             Ok(rv) => Ok(pythonize_this!(rv)),
@@ -72,21 +86,22 @@ impl Pyo3Containers {
     }
     fn create(
         &self,
+        py: Python,
         image: &str,
         attach_stderr: Option<bool>,
         attach_stdin: Option<bool>,
         attach_stdout: Option<bool>,
         auto_remove: Option<bool>,
         _capabilities: Option<&PyList>,
-        _command: Option<&PyList>,
+        command: Option<&PyList>,
         cpu_shares: Option<u32>,
         cpus: Option<f64>,
         _devices: Option<&PyList>,
         _entrypoint: Option<&PyList>,
-        _env: Option<&PyList>,
+        env: Option<&PyList>,
         _expose: Option<&PyList>,
         _extra_hosts: Option<&PyList>,
-        _labels: Option<&PyDict>,
+        labels: Option<&PyDict>,
         links: Option<&PyList>,
         log_driver: Option<&str>,
         memory: Option<u64>,
@@ -95,9 +110,9 @@ impl Pyo3Containers {
         nano_cpus: Option<u64>,
         network_mode: Option<&str>,
         privileged: Option<bool>,
-        _publish: Option<&PyList>,
-        _publish_all_ports: Option<bool>,
-        _restart_policy: Option<&PyDict>, // name,maximum_retry_count,
+        publish: Option<&PyList>,
+        publish_all_ports: Option<bool>,
+        restart_policy: Option<&PyDict>, // name,maximum_retry_count,
         _security_options: Option<&PyList>,
         stop_signal: Option<&str>,
         stop_signal_num: Option<u64>,
@@ -109,14 +124,268 @@ impl Pyo3Containers {
         _volumes_from: Option<&PyList>,
         working_dir: Option<&str>,
     ) -> PyResult<Pyo3Container> {
+        let args = CreateArgs {
+            attach_stderr,
+            attach_stdin,
+            attach_stdout,
+            auto_remove,
+            command,
+            cpu_shares,
+            cpus,
+            env,
+            labels,
+            links,
+            log_driver,
+            memory,
+            memory_swap,
+            name,
+            nano_cpus,
+            network_mode,
+            privileged,
+            publish,
+            publish_all_ports,
+            restart_policy,
+            stop_signal,
+            stop_signal_num,
+            tty,
+            user,
+            userns_mode,
+            working_dir,
+        };
+
+        let opts = args.into_opts(image)?;
+        let rv = py.allow_threads(|| __containers_create(&self.0, &opts));
+        match rv {
+            Ok(rv) => Ok(Pyo3Container(rv)),
+            Err(rv) => Err(py_sys_exception!(rv)),
+        }
+    }
+
+    /// Create and start a container in one call, accepts the same arguments as `create`.
+    ///
+    /// By default the started container is returned. With `detach=False` the call waits for it to
+    /// exit and returns its stdout and stderr instead, raising `DockerError` if it exited with a
+    /// non-zero status. `remove=True` then removes it afterwards, whether or not it succeeded (or
+    /// sets `auto_remove` on a detached container). The GIL is released while waiting.
+    #[pyo3(signature = (image, detach = true, remove = false, **kwargs))]
+    fn run(
+        &self,
+        py: Python,
+        image: &str,
+        detach: bool,
+        remove: bool,
+        kwargs: Option<&PyDict>,
+    ) -> PyResult<PyObject> {
+        let mut args = CreateArgs::from_kwargs(kwargs)?;
+        if detach && remove {
+            args.auto_remove = Some(true);
+        }
+
+        let opts = args.into_opts(image)?;
+        let container = match py.allow_threads(|| __containers_create(&self.0, &opts)) {
+            Ok(container) => container,
+            Err(e) => return Err(py_sys_exception!(e)),
+        };
+        let force = ContainerRemoveOpts::builder().force(true).build();
+
+        if detach {
+            if let Err(e) = py.allow_threads(|| __container_start(&container)) {
+                // auto_remove only applies once a container has run, a failed start leaves it behind
+                if remove {
+                    let _ = py.allow_threads(|| __container_remove(&container, &force));
+                }
+                return Err(py_sys_exception!(e));
+            }
+            return Ok(Pyo3Container(container).into_py(py));
+        }
+
+        let rv = py.allow_threads(|| {
+            let rv = __container_run_attached(&container);
+            if remove {
+                let removed = __container_remove(&container, &force);
+                // a failed start or wait is the error worth reporting, not the cleanup after it
+                if let (Ok(_), Err(e)) = (&rv, removed) {
+                    return Err(e);
+                }
+            }
+            rv
+        });
+
+        match rv {
+            Ok((exit, output)) if exit.status_code == 0 => Ok(output.into_py(py)),
+            Ok((exit, output)) => Err(crate::DockerError::new_err(format!(
+                "Container exited with status {}: {output}",
+                exit.status_code
+            ))),
+            Err(e) => Err(py_sys_exception!(e)),
+        }
+    }
+}
+
+/// The `create` arguments that reach the daemon, shared by `create` and `run`.
+#[derive(Default)]
+struct CreateArgs<'a> {
+    attach_stderr: Option<bool>,
+    attach_stdin: Option<bool>,
+    attach_stdout: Option<bool>,
+    auto_remove: Option<bool>,
+    command: Option<&'a PyList>,
+    cpu_shares: Option<u32>,
+    cpus: Option<f64>,
+    env: Option<&'a PyList>,
+    labels: Option<&'a PyDict>,
+    links: Option<&'a PyList>,
+    log_driver: Option<&'a str>,
+    memory: Option<u64>,
+    memory_swap: Option<i64>,
+    name: Option<&'a str>,
+    nano_cpus: Option<u64>,
+    network_mode: Option<&'a str>,
+    privileged: Option<bool>,
+    publish: Option<&'a PyList>,
+    publish_all_ports: Option<bool>,
+    restart_policy: Option<&'a PyDict>,
+    stop_signal: Option<&'a str>,
+    stop_signal_num: Option<u64>,
+    tty: Option<bool>,
+    user: Option<&'a str>,
+    userns_mode: Option<&'a str>,
+    working_dir: Option<&'a str>,
+}
+
+impl<'a> CreateArgs<'a> {
+    /// Read `create`'s keyword arguments out of `run`'s `**kwargs`.
+    fn from_kwargs(kwargs: Option<&'a PyDict>) -> PyResult<Self> {
+        let mut args = CreateArgs::default();
+        let kwargs = match kwargs {
+            Some(kwargs) => kwargs,
+            None => return Ok(args),
+        };
+
+        for (key, value) in kwargs.iter() {
+            match key.extract::<&str>()? {
+                "attach_stderr" => args.attach_stderr = value.extract()?,
+                "attach_stdin" => args.attach_stdin = value.extract()?,
+                "attach_stdout" => args.attach_stdout = value.extract()?,
+                "auto_remove" => args.auto_remove = value.extract()?,
+                "command" => args.command = value.extract()?,
+                "cpu_shares" => args.cpu_shares = value.extract()?,
+                "cpus" => args.cpus = value.extract()?,
+                "env" => args.env = value.extract()?,
+                "labels" => args.labels = value.extract()?,
+                "links" => args.links = value.extract()?,
+                "log_driver" => args.log_driver = value.extract()?,
+                "memory" => args.memory = value.extract()?,
+                "memory_swap" => args.memory_swap = value.extract()?,
+                "name" => args.name = value.extract()?,
+                "nano_cpus" => args.nano_cpus = value.extract()?,
+                "network_mode" => args.network_mode = value.extract()?,
+                "privileged" => args.privileged = value.extract()?,
+                "publish" => args.publish = value.extract()?,
+                "publish_all_ports" => args.publish_all_ports = value.extract()?,
+                "restart_policy" => args.restart_policy = value.extract()?,
+                "stop_signal" => args.stop_signal = value.extract()?,
+                "stop_signal_num" => args.stop_signal_num = value.extract()?,
+                "tty" => args.tty = value.extract()?,
+                "user" => args.user = value.extract()?,
+                "userns_mode" => args.userns_mode = value.extract()?,
+                "working_dir" => args.working_dir = value.extract()?,
+                // accepted by create but not passed on yet
+                "_capabilities" | "_devices" | "_entrypoint" | "_expose" | "_extra_hosts"
+                | "_security_options" | "_stop_timeout" | "_volumes" | "_volumes_from" => {}
+                key => {
+                    return Err(exceptions::PyTypeError::new_err(format!(
+                        "run() got an unexpected keyword argument {key:?}"
+                    )))
+                }
+            }
+        }
+        Ok(args)
+    }
+
+    fn into_opts(self, image: &str) -> PyResult<ContainerCreateOpts> {
+        let CreateArgs {
+            attach_stderr,
+            attach_stdin,
+            attach_stdout,
+            auto_remove,
+            command,
+            cpu_shares,
+            cpus,
+            env,
+            labels,
+            links,
+            log_driver,
+            memory,
+            memory_swap,
+            name,
+            nano_cpus,
+            network_mode,
+            privileged,
+            publish,
+            publish_all_ports,
+            restart_policy,
+            stop_signal,
+            stop_signal_num,
+            tty,
+            user,
+            userns_mode,
+            working_dir,
+        } = self;
+
         let mut create_opts = ContainerCreateOpts::builder().image(image);
 
-        let links: Option<Vec<&str>> = if links.is_some() {
-            links.unwrap().extract().unwrap()
-        } else {
-            None
+        let links: Option<Vec<&str>> = match links {
+            Some(links) => Some(links.extract()?),
+            None => None,
+        };
+
+        let command: Option<Vec<&str>> = match command {
+            Some(command) => Some(command.extract()?),
+            None => None,
+        };
+
+        let env: Option<Vec<&str>> = match env {
+            Some(env) => Some(env.extract()?),
+            None => None,
+        };
+
+        let labels: Option<HashMap<&str, &str>> = match labels {
+            Some(labels) => Some(labels.extract()?),
+            None => None,
         };
 
+        // validate locally so malformed input never costs a round trip to the daemon
+        if let Some(restart_policy) = restart_policy {
+            let name: &str = match restart_policy.get_item("name") {
+                Some(name) => name.extract()?,
+                None => "",
+            };
+            if !RESTART_POLICIES.contains(&name) {
+                return Err(exceptions::PyValueError::new_err(format!(
+                    "Invalid restart policy: {name:?}, expected one of {RESTART_POLICIES:?}"
+                )));
+            }
+            let maximum_retry_count: u64 = match restart_policy.get_item("maximum_retry_count") {
+                Some(count) => count.extract()?,
+                None => 0,
+            };
+            create_opts = create_opts.restart_policy(name, maximum_retry_count);
+        }
+
+        if let Some(publish) = publish {
+            for spec in publish.extract::<Vec<&str>>()? {
+                create_opts = match __parse_port(spec)? {
+                    (port, Some(host_port)) => create_opts.expose(port, host_port),
+                    (port, None) => create_opts.publish(port),
+                };
+            }
+        }
+
+        if publish_all_ports == Some(true) {
+            create_opts = create_opts.publish_all_ports();
+        }
+
         bo_setter!(attach_stderr, create_opts);
         bo_setter!(attach_stdin, create_opts);
         bo_setter!(attach_stdout, create_opts);
@@ -142,58 +411,145 @@ impl Pyo3Containers {
         // bo_setter!(devices, create_opts);
 
         bo_setter!(links, create_opts);
+        bo_setter!(command, create_opts);
+        bo_setter!(labels, create_opts);
+        bo_setter!(env, create_opts);
 
-        // bo_setter!(publish_all_ports, create_opts);
-        // bo_setter!(restart_policy, create_opts);
         // bo_setter!(security_options, create_opts);
         // bo_setter!(stop_timeout, create_opts);
         // bo_setter!(volumes, create_opts);
         // bo_setter!(volumes_from, create_opts);
         // bo_setter!(capabilities, create_opts);
-        // bo_setter!(command, create_opts);
         // bo_setter!(entrypoint, create_opts);
-        // bo_setter!(env, create_opts);
         // bo_setter!(expose, create_opts);
         // bo_setter!(extra_hosts, create_opts);
-        // bo_setter!(labels, create_opts);
 
-        let rv = __containers_create(&self.0, &create_opts.build());
-        match rv {
-            Ok(rv) => Ok(Pyo3Container(rv)),
-            Err(rv) => Err(py_sys_exception!(rv)),
+        Ok(create_opts.build())
+    }
+}
+
+/// Translate a `{"label": ..., "name": ..., "id": ...}` dict into list filters, each value may be a
+/// string or a list of strings. labels are given as `key` or `key=value`.
+fn __container_filters(filters: &PyDict) -> PyResult<Vec<ContainerFilter>> {
+    let mut rv = Vec::with_capacity(filters.len());
+    for (key, value) in filters.iter() {
+        let key: &str = key.extract()?;
+        for value in __filter_values(value)? {
+            rv.push(match key {
+                "label" => match value.split_once('=') {
+                    Some((k, v)) => ContainerFilter::Label(k.to_string(), v.to_string()),
+                    None => ContainerFilter::LabelKey(value),
+                },
+                "name" => ContainerFilter::Name(value),
+                "id" => ContainerFilter::Id(value),
+                _ => {
+                    return Err(exceptions::PyValueError::new_err(format!(
+                        "Unsupported container filter: {key:?}, expected one of label, name, id"
+                    )))
+                }
+            });
+        }
+    }
+    Ok(rv)
+}
+
+/// Translate a `{"label": ..., "until": ...}` dict into prune filters, values as for `list`.
+fn __container_prune_filters(filters: &PyDict) -> PyResult<Vec<ContainerPruneFilter>> {
+    let mut rv = Vec::with_capacity(filters.len());
+    for (key, value) in filters.iter() {
+        let key: &str = key.extract()?;
+        for value in __filter_values(value)? {
+            rv.push(match key {
+                "label" => match value.split_once('=') {
+                    Some((k, v)) => ContainerPruneFilter::Label(k.to_string(), v.to_string()),
+                    None => ContainerPruneFilter::LabelKey(value),
+                },
+                "until" => ContainerPruneFilter::Until(value),
+                _ => {
+                    return Err(exceptions::PyValueError::new_err(format!(
+                        "Unsupported container prune filter: {key:?}, expected one of label, until"
+                    )))
+                }
+            });
         }
     }
+    Ok(rv)
+}
+
+/// The `wait` of `stop` and `restart` as a std duration, negative durations are rejected.
+fn __wait_duration(wait: Option<&PyDelta>) -> PyResult<Option<Duration>> {
+    match wait {
+        Some(wait) => match wait.extract::<chrono::Duration>()?.to_std() {
+            Ok(wait) => Ok(Some(wait)),
+            Err(_) => Err(exceptions::PyValueError::new_err(
+                "wait must not be negative",
+            )),
+        },
+        None => Ok(None),
+    }
+}
+
+/// A filter value may be a single string or a list of them.
+pub(crate) fn __filter_values(value: &PyAny) -> PyResult<Vec<String>> {
+    match value.extract::<String>() {
+        Ok(value) => Ok(vec![value]),
+        Err(_) => value.extract(),
+    }
+}
+
+const RESTART_POLICIES: [&str; 4] = ["no", "always", "unless-stopped", "on-failure"];
+
+/// Parse a `[host_port:]container_port[/protocol]` mapping.
+fn __parse_port(spec: &str) -> PyResult<(PublishPort, Option<u32>)> {
+    let invalid = || {
+        exceptions::PyValueError::new_err(format!(
+            "Invalid port mapping format: {spec:?}, expected [host_port:]container_port[/tcp|udp]"
+        ))
+    };
+
+    let (ports, protocol) = spec.split_once('/').unwrap_or((spec, "tcp"));
+    let (host_port, container_port) = match ports.split_once(':') {
+        Some((host_port, container_port)) => (
+            Some(host_port.parse().map_err(|_| invalid())?),
+            container_port,
+        ),
+        None => (None, ports),
+    };
+    let container_port: u32 = container_port.parse().map_err(|_| invalid())?;
+
+    let port = match protocol {
+        "tcp" => PublishPort::tcp(container_port),
+        "udp" => PublishPort::udp(container_port),
+        _ => return Err(invalid()),
+    };
+    Ok((port, host_port))
 }
 
-#[tokio::main]
-async fn __containers_list(
+fn __containers_list(
     containers: &Containers,
     opts: &ContainerListOpts,
-) -> Vec<ContainerSummary> {
-    let x = containers.list(opts).await;
-    x.unwrap()
+) -> Result<Vec<ContainerSummary>, docker_api::Error> {
+    crate::block_on(async move { containers.list(opts).await })
 }
 
-#[tokio::main]
-async fn __containers_prune(
+fn __containers_prune(
     containers: &Containers,
     opts: &ContainerPruneOpts,
 ) -> Result<ContainerPrune200Response, docker_api::Error> {
-    containers.prune(opts).await
+    crate::block_on(async move { containers.prune(opts).await })
 }
 
-#[tokio::main]
-async fn __containers_create(
+fn __containers_create(
     containers: &Containers,
     opts: &ContainerCreateOpts,
 ) -> Result<Container, docker_api::Error> {
-    containers.create(opts).await
+    crate::block_on(async move { containers.create(opts).await })
 }
 
 #[pymethods]
 impl Pyo3Container {
     #[new]
-    fn new(docker: Pyo3Docker, id: String) -> Self {
+    fn new(docker: Pyo3Docker, id: &str) -> Self {
         Pyo3Container(Container::new(docker.0, id))
     }
 
@@ -201,19 +557,23 @@ impl Pyo3Container {
         self.0.id().to_string()
     }
 
-    fn inspect(&self) -> Py<PyAny> {
-        let ci = __container_inspect(&self.0);
-        pythonize_this!(ci)
+    fn inspect(&self) -> PyResult<Py<PyAny>> {
+        match __container_inspect(&self.0) {
+            Ok(ci) => Ok(pythonize_this!(ci)),
+            Err(e) => Err(py_sys_exception!(e)),
+        }
     }
     fn logs(
         &self,
+        py: Python,
         stdout: Option<bool>,
         stderr: Option<bool>,
         timestamps: Option<bool>,
         n_lines: Option<usize>,
         all: Option<bool>,
         since: Option<&PyDateTime>,
-    ) -> String {
+        callback: Option<&PyAny>,
+    ) -> PyResult<String> {
         let mut log_opts = LogsOpts::builder();
 
         bo_setter!(stdout, log_opts);
@@ -227,27 +587,52 @@ impl Pyo3Container {
         }
 
         if since.is_some() {
-            let rs_since: DateTime<Utc> = since.unwrap().extract().unwrap();
+            let rs_since: DateTime<Utc> = since.unwrap().extract()?;
             log_opts = log_opts.since(&rs_since);
         }
 
-        __container_logs(&self.0, &log_opts.build())
+        let log_opts = log_opts.build();
+        match callback {
+            Some(callback) => {
+                crate::for_each_with_gil(py, self.0.logs(&log_opts), |chunk| {
+                    callback.call1((PyBytes::new(py, &chunk),))?;
+                    Ok(())
+                })?;
+                Ok(String::new())
+            }
+            None => match py.allow_threads(|| __container_logs(&self.0, &log_opts)) {
+                Ok(logs) => Ok(logs),
+                Err(e) => Err(py_sys_exception!(e)),
+            },
+        }
     }
 
-    fn remove(&self) -> PyResult<()> {
-        Err(exceptions::PyNotImplementedError::new_err(
-            "This method is not available yet.",
-        ))
+    /// Remove the container, `force=True` kills a running container first so no separate stop is needed.
+    fn remove(
+        &self,
+        py: Python,
+        force: Option<bool>,
+        volumes: Option<bool>,
+        link: Option<bool>,
+    ) -> PyResult<()> {
+        let mut opts = ContainerRemoveOpts::builder();
+
+        bo_setter!(force, opts);
+        bo_setter!(volumes, opts);
+        bo_setter!(link, opts);
+
+        let opts = opts.build();
+        let rv = py.allow_threads(|| __container_remove(&self.0, &opts));
+        match rv {
+            Ok(_rv) => Ok(()),
+            Err(rv) => Err(py_sys_exception!(rv)),
+        }
     }
 
     fn delete(&self) -> PyResult<()> {
-        let rv = __container_delete(&self.0);
-        if rv.is_ok() {
-            Ok(())
-        } else {
-            Err(exceptions::PySystemError::new_err(
-                "Failed to delete container.",
-            ))
+        match __container_delete(&self.0) {
+            Ok(_rv) => Ok(()),
+            Err(rv) => Err(py_sys_exception!(rv)),
         }
     }
 
@@ -265,48 +650,33 @@ impl Pyo3Container {
     //     Ok(())
     // }
 
-    fn start(&self) -> PyResult<()> {
-        let rv = __container_start(&self.0);
+    /// Start the container. The GIL is released while the daemon starts it.
+    fn start(&self, py: Python) -> PyResult<()> {
+        let rv = py.allow_threads(|| __container_start(&self.0));
 
         match rv {
             Ok(_rv) => Ok(()),
-            Err(_rv) => Err(exceptions::PySystemError::new_err(
-                "Failed to start container",
-            )),
+            Err(rv) => Err(py_sys_exception!(rv)),
         }
     }
 
     fn stop(&self, wait: Option<&PyDelta>) -> PyResult<()> {
-        let wait: Option<std::time::Duration> = wait.map(|wait| {
-            wait.extract::<chrono::Duration>()
-                .unwrap()
-                .to_std()
-                .unwrap()
-        });
+        let wait = __wait_duration(wait)?;
 
         let rv = __container_stop(&self.0, wait);
         match rv {
             Ok(_rv) => Ok(()),
-            Err(_rv) => Err(exceptions::PySystemError::new_err(
-                "Failed to start container",
-            )),
+            Err(rv) => Err(py_sys_exception!(rv)),
         }
     }
 
     fn restart(&self, wait: Option<&PyDelta>) -> PyResult<()> {
-        let wait: Option<std::time::Duration> = wait.map(|wait| {
-            wait.extract::<chrono::Duration>()
-                .unwrap()
-                .to_std()
-                .unwrap()
-        });
+        let wait = __wait_duration(wait)?;
 
         let rv = __container_restart(&self.0, wait);
         match rv {
             Ok(_rv) => Ok(()),
-            Err(_rv) => Err(exceptions::PySystemError::new_err(
-                "Failed to stop container",
-            )),
+            Err(rv) => Err(py_sys_exception!(rv)),
         }
     }
 
@@ -314,9 +684,7 @@ impl Pyo3Container {
         let rv = __container_kill(&self.0, signal);
         match rv {
             Ok(_rv) => Ok(()),
-            Err(_rv) => Err(exceptions::PySystemError::new_err(
-                "Failed to kill container",
-            )),
+            Err(rv) => Err(py_sys_exception!(rv)),
         }
     }
 
@@ -324,9 +692,7 @@ impl Pyo3Container {
         let rv = __container_rename(&self.0, name);
         match rv {
             Ok(_rv) => Ok(()),
-            Err(_rv) => Err(exceptions::PySystemError::new_err(
-                "Failed to rename container",
-            )),
+            Err(rv) => Err(py_sys_exception!(rv)),
         }
     }
 
@@ -334,9 +700,7 @@ impl Pyo3Container {
         let rv = __container_pause(&self.0);
         match rv {
             Ok(_rv) => Ok(()),
-            Err(_rv) => Err(exceptions::PySystemError::new_err(
-                "Failed to pause container",
-            )),
+            Err(rv) => Err(py_sys_exception!(rv)),
         }
     }
 
@@ -344,19 +708,36 @@ impl Pyo3Container {
         let rv = __container_unpause(&self.0);
         match rv {
             Ok(_rv) => Ok(()),
-            Err(_rv) => Err(exceptions::PySystemError::new_err(
-                "Failed to unpause container",
-            )),
+            Err(rv) => Err(py_sys_exception!(rv)),
+        }
+    }
+
+    /// Block until the daemon reports the container running, polling every 50ms, raising
+    /// TimeoutError once `timeout_ms` has passed. The GIL is released while waiting.
+    #[pyo3(signature = (timeout_ms = 2000))]
+    fn wait_until_running(&self, py: Python, timeout_ms: u64) -> PyResult<()> {
+        let timeout = Duration::from_millis(timeout_ms);
+        match py.allow_threads(|| __container_wait_until_running(&self.0, timeout)) {
+            Ok(true) => Ok(()),
+            Ok(false) => Err(exceptions::PyTimeoutError::new_err(format!(
+                "Container was not running after {timeout_ms}ms"
+            ))),
+            Err(e) => Err(py_sys_exception!(e)),
         }
     }
 
-    fn wait(&self) -> Py<PyAny> {
-        let rv = __container_wait(&self.0).unwrap();
-        pythonize_this!(rv)
+    /// Block until the container stops. The GIL is released while waiting, so other Python threads
+    /// (or a thread pool waiting on several containers) keep running.
+    fn wait(&self, py: Python) -> PyResult<Py<PyAny>> {
+        match py.allow_threads(|| __container_wait(&self.0)) {
+            Ok(rv) => Ok(pythonize_this!(rv)),
+            Err(e) => Err(py_sys_exception!(e)),
+        }
     }
 
     fn exec(
         &self,
+        py: Python,
         command: &PyList,
         env: Option<&PyList>,
         attach_stdout: Option<bool>,
@@ -366,12 +747,13 @@ impl Pyo3Container {
         privileged: Option<bool>,
         user: Option<&str>,
         working_dir: Option<&str>,
-    ) -> PyResult<()> {
-        let command: Vec<&str> = command.extract().unwrap();
+    ) -> PyResult<String> {
+        // borrow the python strings for the call rather than copying them into owned Strings
+        let command: Vec<&str> = command.extract()?;
         let mut exec_opts = ExecCreateOpts::builder().command(command);
 
-        if env.is_some() {
-            let env: Vec<&str> = env.unwrap().extract().unwrap();
+        if let Some(env) = env {
+            let env: Vec<&str> = env.extract()?;
             exec_opts = exec_opts.env(env);
         }
 
@@ -383,49 +765,42 @@ impl Pyo3Container {
         bo_setter!(user, exec_opts);
         bo_setter!(working_dir, exec_opts);
 
-        let rv = __container_exec(&self.0, exec_opts.build());
-        let rv = rv.unwrap();
+        let exec_opts = exec_opts.build();
+        let rv = py.allow_threads(|| __container_exec(&self.0, exec_opts));
         match rv {
-            Ok(_rv) => Ok(()),
-            Err(rv) => Err(exceptions::PySystemError::new_err(format!(
-                "Failed to exec container {rv}"
-            ))),
+            Ok(rv) => Ok(rv),
+            Err(rv) => Err(py_sys_exception!(rv)),
         }
     }
 
-    fn copy_from(&self, src: &str, dst: &str) -> PyResult<()> {
-        let rv = __container_copy_from(&self.0, src);
+    fn copy_from(&self, py: Python, src: &str, dst: &str) -> PyResult<()> {
+        let rv = py.allow_threads(|| __container_copy_from(&self.0, src));
 
         match rv {
-            Ok(rv) => {
-                let mut archive = Archive::new(&rv[..]);
-                let r = archive.unpack(dst);
-                match r {
-                    Ok(_r) => Ok(()),
-                    Err(r) => Err(exceptions::PySystemError::new_err(format!("{r}"))),
-                }
-            }
-            Err(rv) => Err(exceptions::PySystemError::new_err(format!("{rv}"))),
+            // unpacking is local, a failure there is an OSError rather than a daemon error
+            Ok(rv) => Ok(Archive::new(&rv[..]).unpack(dst)?),
+            Err(rv) => Err(py_sys_exception!(rv)),
         }
     }
 
-    fn copy_file_into(&self, src: &str, dst: &str) -> PyResult<()> {
-        let mut file = File::open(src).unwrap();
-        let mut bytes = Vec::new();
-        file.read_to_end(&mut bytes)
-            .expect("Cannot read file on the localhost.");
+    fn copy_file_into(&self, py: Python, src: &str, dst: &str) -> PyResult<()> {
+        // fs::read sizes the buffer from the file's metadata up front, a missing or unreadable
+        // file surfaces as the matching OSError
+        let bytes = std::fs::read(src)?;
 
-        let rv = __container_copy_file_into(&self.0, dst, &bytes);
+        let rv = py.allow_threads(|| __container_copy_file_into(&self.0, dst, &bytes));
 
         match rv {
             Ok(_rv) => Ok(()),
-            Err(rv) => Err(exceptions::PySystemError::new_err(format!("{rv}"))),
+            Err(rv) => Err(py_sys_exception!(rv)),
         }
     }
 
-    fn stat_file(&self, path: &str) -> Py<PyAny> {
-        let rv = __container_stat_file(&self.0, path).unwrap();
-        pythonize_this!(rv)
+    fn stat_file(&self, path: &str) -> PyResult<Py<PyAny>> {
+        match __container_stat_file(&self.0, path) {
+            Ok(rv) => Ok(pythonize_this!(rv)),
+            Err(e) => Err(py_sys_exception!(e)),
+        }
     }
 
     fn commit(&self) -> PyResult<()> {
@@ -434,133 +809,162 @@ impl Pyo3Container {
         ))
     }
 
-    fn __repr__(&self) -> String {
-        let inspect = __container_inspect(&self.0);
-        format!(
+    fn __repr__(&self) -> PyResult<String> {
+        let inspect = __container_inspect(&self.0).map_err(|e| py_sys_exception!(e))?;
+        let status = inspect.state.and_then(|state| state.status);
+        Ok(format!(
             "Container(id: {}, name: {}, status: {})",
-            inspect.id.unwrap(),
-            inspect.name.unwrap(),
-            inspect.state.unwrap().status.unwrap()
-        )
+            inspect.id.unwrap_or_default(),
+            inspect.name.unwrap_or_default(),
+            status.map(|status| status.to_string()).unwrap_or_default()
+        ))
     }
 
-    fn __string__(&self) -> String {
+    fn __string__(&self) -> PyResult<String> {
         self.__repr__()
     }
 }
 
-#[tokio::main]
-async fn __container_inspect(container: &Container) -> ContainerInspect200Response {
-    let c = container.inspect().await;
-    c.unwrap()
+fn __container_inspect(
+    container: &Container,
+) -> Result<ContainerInspect200Response, docker_api::Error> {
+    crate::block_on(async move { container.inspect().await })
 }
 
-#[tokio::main]
-async fn __container_logs(container: &Container, log_opts: &LogsOpts) -> String {
-    let log_stream = container.logs(log_opts);
+fn __container_logs(
+    container: &Container,
+    log_opts: &LogsOpts,
+) -> Result<String, docker_api::Error> {
+    crate::block_on(async move {
+        let mut log_stream = container.logs(log_opts);
+        let mut log = Vec::new();
 
-    let log = log_stream
-        .map(|chunk| match chunk {
-            Ok(chunk) => chunk.to_vec(),
-            Err(e) => {
-                eprintln!("Error: {e}");
-                vec![]
-            }
-        })
-        .collect::<Vec<_>>()
-        .await
-        .into_iter()
-        .flatten()
-        .collect::<Vec<_>>();
-
-    format!("{}", String::from_utf8_lossy(&log))
+        while let Some(chunk) = log_stream.next().await {
+            log.extend_from_slice(&chunk?);
+        }
+
+        Ok(String::from_utf8_lossy(&log).into_owned())
+    })
+}
+
+fn __container_delete(container: &Container) -> Result<String, docker_api::Error> {
+    crate::block_on(async move { container.delete().await })
 }
 
-#[tokio::main]
-async fn __container_delete(container: &Container) -> Result<String, docker_api::Error> {
-    container.delete().await
+fn __container_remove(
+    container: &Container,
+    opts: &ContainerRemoveOpts,
+) -> Result<String, docker_api::Error> {
+    crate::block_on(async move { container.remove(opts).await })
 }
 
-#[tokio::main]
-async fn __container_start(container: &Container) -> Result<(), docker_api::Error> {
-    container.start().await
+fn __container_start(container: &Container) -> Result<(), docker_api::Error> {
+    crate::block_on(async move { container.start().await })
 }
 
-#[tokio::main]
-async fn __container_stop(
+fn __container_stop(
     container: &Container,
     wait: Option<std::time::Duration>,
 ) -> Result<(), docker_api::Error> {
-    container.stop(wait).await
+    crate::block_on(async move { container.stop(wait).await })
 }
 
-#[tokio::main]
-async fn __container_restart(
+fn __container_restart(
     container: &Container,
     wait: Option<std::time::Duration>,
 ) -> Result<(), docker_api::Error> {
-    container.restart(wait).await
+    crate::block_on(async move { container.restart(wait).await })
 }
 
-#[tokio::main]
-async fn __container_kill(
-    container: &Container,
-    signal: Option<&str>,
-) -> Result<(), docker_api::Error> {
-    container.kill(signal).await
+fn __container_kill(container: &Container, signal: Option<&str>) -> Result<(), docker_api::Error> {
+    crate::block_on(async move { container.kill(signal).await })
 }
 
-#[tokio::main]
-async fn __container_rename(container: &Container, name: &str) -> Result<(), docker_api::Error> {
-    container.rename(name).await
+fn __container_rename(container: &Container, name: &str) -> Result<(), docker_api::Error> {
+    crate::block_on(async move { container.rename(name).await })
 }
 
-#[tokio::main]
-async fn __container_pause(container: &Container) -> Result<(), docker_api::Error> {
-    container.pause().await
+fn __container_pause(container: &Container) -> Result<(), docker_api::Error> {
+    crate::block_on(async move { container.pause().await })
 }
 
-#[tokio::main]
-async fn __container_unpause(container: &Container) -> Result<(), docker_api::Error> {
-    container.unpause().await
+fn __container_unpause(container: &Container) -> Result<(), docker_api::Error> {
+    crate::block_on(async move { container.unpause().await })
 }
 
-#[tokio::main]
-async fn __container_wait(
+fn __container_wait(container: &Container) -> Result<ContainerWaitResponse, docker_api::Error> {
+    crate::block_on(async move { container.wait().await })
+}
+
+/// Start `container`, wait for it to exit and collect its stdout and stderr.
+fn __container_run_attached(
     container: &Container,
-) -> Result<ContainerWaitResponse, docker_api::Error> {
-    container.wait().await
+) -> Result<(ContainerWaitResponse, String), docker_api::Error> {
+    crate::block_on(async move {
+        container.start().await?;
+        let exit = container.wait().await?;
+
+        let log_opts = LogsOpts::builder().stdout(true).stderr(true).build();
+        let mut log_stream = container.logs(&log_opts);
+        let mut log = Vec::new();
+        while let Some(chunk) = log_stream.next().await {
+            log.extend_from_slice(&chunk?);
+        }
+
+        Ok((exit, String::from_utf8_lossy(&log).into_owned()))
+    })
 }
 
-#[tokio::main]
-async fn __container_exec(
+fn __container_wait_until_running(
     container: &Container,
-    exec_opts: ExecCreateOpts,
-) -> Option<Result<TtyChunk, docker_api::conn::Error>> {
-    container.exec(&exec_opts).next().await
+    timeout: Duration,
+) -> Result<bool, docker_api::Error> {
+    crate::block_on(async move {
+        let poll = async {
+            loop {
+                let state = container.inspect().await?.state;
+                if state.and_then(|state| state.running).unwrap_or(false) {
+                    return Ok::<(), docker_api::Error>(());
+                }
+                tokio::time::sleep(Duration::from_millis(50)).await;
+            }
+        };
+
+        match tokio::time::timeout(timeout, poll).await {
+            Ok(rv) => rv.map(|_| true),
+            Err(_elapsed) => Ok(false),
+        }
+    })
 }
 
-#[tokio::main]
-async fn __container_copy_from(
+fn __container_exec(
     container: &Container,
-    path: &str,
-) -> Result<Vec<u8>, docker_api::Error> {
-    container.copy_from(path).try_concat().await
+    exec_opts: ExecCreateOpts,
+) -> Result<String, docker_api::conn::Error> {
+    crate::block_on(async move {
+        let mut exec_stream = container.exec(&exec_opts);
+        let mut output = Vec::new();
+
+        while let Some(chunk) = exec_stream.next().await {
+            output.extend_from_slice(&chunk?);
+        }
+
+        Ok(String::from_utf8_lossy(&output).into_owned())
+    })
+}
+
+fn __container_copy_from(container: &Container, path: &str) -> Result<Vec<u8>, docker_api::Error> {
+    crate::block_on(async move { container.copy_from(path).try_concat().await })
 }
 
-#[tokio::main]
-async fn __container_copy_file_into(
+fn __container_copy_file_into(
     container: &Container,
     dst: &str,
     bytes: &Vec<u8>,
 ) -> Result<(), docker_api::Error> {
-    container.copy_file_into(dst, bytes).await
+    crate::block_on(async move { container.copy_file_into(dst, bytes).await })
 }
 
-#[tokio::main]
-async fn __container_stat_file(
-    container: &Container,
-    src: &str,
-) -> Result<String, docker_api::Error> {
-    container.stat_file(src).await
+fn __container_stat_file(container: &Container, src: &str) -> Result<String, docker_api::Error> {
+    crate::block_on(async move { container.stat_file(src).await })
 }
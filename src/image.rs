@@ -1,26 +1,31 @@
-use std::fs::OpenOptions;
+use std::fs::File;
 
+use crate::container::__filter_values;
 use crate::Pyo3Docker;
 use docker_api::models::{
     ImageDeleteResponseItem, ImageHistory200Response, ImageInspect, ImagePrune200Response,
     ImageSummary,
 };
 use docker_api::opts::{
-    ImageBuildOpts, ImageListOpts, ImagePushOpts, PullOpts, RegistryAuth, TagOpts,
+    ImageBuildOpts, ImageListOpts, ImagePruneFilter, ImagePruneOpts, ImagePushOpts, PullOpts,
+    RegistryAuth, TagOpts,
 };
 
 use docker_api::{Image, Images};
-use futures_util::StreamExt;
+use futures_util::{StreamExt, TryStreamExt};
 use pyo3::exceptions;
 use pyo3::prelude::*;
-use pyo3::types::PyDict;
+use pyo3::types::{PyBytes, PyDict};
 use pythonize::pythonize;
+use std::collections::HashMap;
+use std::fmt::Write as _;
 use std::io::Write;
 
 #[pymodule]
 pub fn image(_py: Python<'_>, m: &PyModule) -> PyResult<()> {
     m.add_class::<Pyo3Images>()?;
     m.add_class::<Pyo3Image>()?;
+    m.add_class::<Pyo3RegistryAuth>()?;
     Ok(())
 }
 
@@ -32,6 +37,11 @@ pub struct Pyo3Images(pub Images);
 #[pyclass(name = "Image")]
 pub struct Pyo3Image(pub Image);
 
+/// Registry credentials parsed once, so they can be reused across pulls and pushes.
+#[derive(Clone, Debug)]
+#[pyclass(name = "RegistryAuth")]
+pub struct Pyo3RegistryAuth(pub RegistryAuth);
+
 #[pymethods]
 impl Pyo3Images {
     #[new]
@@ -57,19 +67,36 @@ impl Pyo3Images {
 
         match rv {
             Ok(rv) => Ok(pythonize_this!(rv)),
-            Err(rv) => Err(exceptions::PySystemError::new_err(format!("{rv:?}"))),
+            Err(rv) => Err(py_sys_exception!(rv)),
         }
     }
 
-    fn prune(&self) -> PyResult<Py<PyAny>> {
-        match __images_prune(&self.0) {
+    fn inspect_many(&self, names: Vec<&str>) -> PyResult<Py<PyAny>> {
+        let rv = __images_inspect_many(&self.0, &names);
+
+        match rv {
+            Ok(rv) => Ok(pythonize_this!(rv)),
+            Err(rv) => Err(py_sys_exception!(rv)),
+        }
+    }
+
+    fn prune(&self, filters: Option<&PyDict>) -> PyResult<Py<PyAny>> {
+        let mut opts = ImagePruneOpts::builder();
+        if let Some(filters) = filters {
+            opts = opts.filter(__image_prune_filters(filters)?);
+        }
+
+        match __images_prune(&self.0, &opts.build()) {
             Ok(info) => Ok(pythonize_this!(info)),
-            Err(e) => Err(exceptions::PySystemError::new_err(format!("{e:?}"))),
+            Err(e) => Err(py_sys_exception!(e)),
         }
     }
 
+    /// Build an image. Progress frames are handed to `callback` as they arrive when one is given
+    /// and `None` is returned, otherwise they are collected and returned once the build completes.
     fn build(
         &self,
+        py: Python,
         path: &str,
         dockerfile: Option<&str>,
         tag: Option<&str>,
@@ -92,8 +119,17 @@ impl Pyo3Images {
         platform: Option<&str>,
         target: Option<&str>,
         outputs: Option<&str>,
-        _labels: Option<&PyDict>,
+        labels: Option<&PyDict>,
+        callback: Option<&PyAny>,
+        nocache: Option<bool>,
     ) -> PyResult<Py<PyAny>> {
+        // `nocahe` mirrors the misspelt builder method and stays for existing callers
+        let nocahe = nocache.or(nocahe);
+        let labels: Option<HashMap<&str, &str>> = match labels {
+            Some(labels) => Some(labels.extract()?),
+            None => None,
+        };
+
         let mut bo = ImageBuildOpts::builder(path);
 
         bo_setter!(dockerfile, bo);
@@ -117,8 +153,17 @@ impl Pyo3Images {
         bo_setter!(platform, bo);
         bo_setter!(target, bo);
         bo_setter!(outputs, bo);
-
-        let rv = __images_build(&self.0, &bo.build());
+        bo_setter!(labels, bo);
+
+        let bo = bo.build();
+        if let Some(callback) = callback {
+            crate::for_each_with_gil(py, self.0.build(&bo), |output| {
+                callback.call1((pythonize(py, &output)?,))?;
+                Ok(())
+            })?;
+            return Ok(py.None());
+        }
+        let rv = py.allow_threads(|| __images_build(&self.0, &bo));
 
         match rv {
             Ok(rv) => Ok(pythonize_this!(rv)),
@@ -132,72 +177,29 @@ impl Pyo3Images {
     //     ))
     // }
 
+    /// Pull an image. Progress frames are handed to `callback` as they arrive when one is given
+    /// and `None` is returned, otherwise they are collected and returned once the pull completes.
     fn pull(
         &self,
+        py: Python,
         image: Option<&str>,
         src: Option<&str>,
         repo: Option<&str>,
         tag: Option<&str>,
         auth_password: Option<&PyDict>,
         auth_token: Option<&PyDict>,
+        auth: Option<Pyo3RegistryAuth>,
+        callback: Option<&PyAny>,
     ) -> PyResult<Py<PyAny>> {
         let mut pull_opts = PullOpts::builder();
 
-        if auth_password.is_some() && auth_token.is_some() {
-            let msg = "Got both auth_password and auth_token for image.push(). Only one of these options is allowed";
-            return Err(py_sys_exception!(msg));
-        }
-
-        let auth = if auth_password.is_some() && auth_token.is_none() {
-            let username = auth_password.unwrap().get_item("username");
-            let password = auth_password.unwrap().get_item("password");
-            let email = auth_password.unwrap().get_item("email");
-            let server_address = auth_password.unwrap().get_item("server_address");
-
-            let username = if username.is_none() {
-                None
-            } else {
-                Some(username.unwrap().extract::<String>().unwrap())
-            };
-
-            let password = if password.is_none() {
-                None
-            } else {
-                Some(password.unwrap().extract::<String>().unwrap())
-            };
-
-            let email = if email.is_none() {
-                None
-            } else {
-                Some(email.unwrap().extract::<String>().unwrap())
-            };
-
-            let server_address = if server_address.is_none() {
-                None
-            } else {
-                Some(server_address.unwrap().extract::<String>().unwrap())
-            };
-
-            let mut ra = RegistryAuth::builder();
-
-            bo_setter!(username, ra);
-            bo_setter!(password, ra);
-            bo_setter!(email, ra);
-            bo_setter!(server_address, ra);
-
-            Some(ra.build())
-        } else if auth_token.is_some() && auth_password.is_none() {
-            let token = RegistryAuth::token(
-                auth_token
-                    .unwrap()
-                    .get_item("identity_token")
-                    .unwrap()
-                    .extract::<String>()
-                    .unwrap(),
-            );
-            Some(token)
-        } else {
-            Some(RegistryAuth::builder().build())
+        let auth = match auth {
+            Some(_) if auth_password.is_some() || auth_token.is_some() => {
+                let msg = "Got auth alongside auth_password/auth_token for images.pull(). Only one of these options is allowed";
+                return Err(exceptions::PyValueError::new_err(msg));
+            }
+            Some(auth) => Some(auth.0),
+            None => Some(__registry_auth(auth_password, auth_token)?),
         };
 
         bo_setter!(src, pull_opts);
@@ -206,11 +208,18 @@ impl Pyo3Images {
         bo_setter!(image, pull_opts);
         bo_setter!(auth, pull_opts);
 
-        let rv = __images_pull(&self.0, &pull_opts.build());
+        let pull_opts = pull_opts.build();
+        if let Some(callback) = callback {
+            crate::for_each_with_gil(py, self.0.pull(&pull_opts), |output| {
+                callback.call1((pythonize(py, &output)?,))?;
+                Ok(())
+            })?;
+            return Ok(py.None());
+        }
 
-        match rv {
+        match py.allow_threads(|| __images_pull(&self.0, &pull_opts)) {
             Ok(rv) => Ok(pythonize_this!(rv)),
-            Err(rv) => Err(exceptions::PySystemError::new_err(format!("{rv}"))),
+            Err(e) => Err(py_sys_exception!(e)),
         }
     }
 
@@ -239,60 +248,166 @@ impl Pyo3Images {
     }
 }
 
-#[tokio::main]
-async fn __images_list(
+pub(crate) fn __registry_auth(
+    auth_password: Option<&PyDict>,
+    auth_token: Option<&PyDict>,
+) -> PyResult<RegistryAuth> {
+    if auth_password.is_some() && auth_token.is_some() {
+        let msg = "Got both auth_password and auth_token. Only one of these options is allowed";
+        return Err(exceptions::PyValueError::new_err(msg));
+    }
+
+    let auth = if let Some(auth_password) = auth_password {
+        let username = auth_password.get_item("username");
+        let password = auth_password.get_item("password");
+        let email = auth_password.get_item("email");
+        let server_address = auth_password.get_item("server_address");
+
+        let username = if username.is_none() {
+            None
+        } else {
+            Some(username.unwrap().extract::<String>()?)
+        };
+
+        let password = if password.is_none() {
+            None
+        } else {
+            Some(password.unwrap().extract::<String>()?)
+        };
+
+        let email = if email.is_none() {
+            None
+        } else {
+            Some(email.unwrap().extract::<String>()?)
+        };
+
+        let server_address = if server_address.is_none() {
+            None
+        } else {
+            Some(server_address.unwrap().extract::<String>()?)
+        };
+
+        let mut ra = RegistryAuth::builder();
+
+        bo_setter!(username, ra);
+        bo_setter!(password, ra);
+        bo_setter!(email, ra);
+        bo_setter!(server_address, ra);
+
+        ra.build()
+    } else if let Some(auth_token) = auth_token {
+        let identity_token = match auth_token.get_item("identity_token") {
+            Some(identity_token) => identity_token.extract::<String>()?,
+            None => {
+                let msg = "auth_token requires an identity_token";
+                return Err(exceptions::PyValueError::new_err(msg));
+            }
+        };
+        RegistryAuth::token(identity_token)
+    } else {
+        RegistryAuth::builder().build()
+    };
+
+    Ok(auth)
+}
+
+fn __images_list(
     images: &Images,
     opts: &ImageListOpts,
 ) -> Result<Vec<ImageSummary>, docker_api::Error> {
-    images.list(opts).await
+    crate::block_on(async move { images.list(opts).await })
 }
 
-#[tokio::main]
-async fn __images_prune(images: &Images) -> Result<ImagePrune200Response, docker_api::Error> {
-    images.prune(&Default::default()).await
+fn __images_inspect_many(
+    images: &Images,
+    names: &[&str],
+) -> Result<Vec<ImageInspect>, docker_api::Error> {
+    crate::block_on(async move {
+        let images: Vec<Image> = names.iter().map(|name| images.get(*name)).collect();
+        futures_util::future::try_join_all(images.iter().map(|image| image.inspect())).await
+    })
 }
 
-#[tokio::main]
-async fn __images_build(
-    images: &Images,
-    opts: &ImageBuildOpts,
-) -> Result<Vec<String>, docker_api::Error> {
-    use futures_util::StreamExt;
-    let mut stream = images.build(opts);
-    let mut ok_stream_vec = Vec::new();
-    let mut err_message = None;
-    while let Some(build_result) = stream.next().await {
-        match build_result {
-            Ok(output) => ok_stream_vec.push(format!("{output:?}")),
-            Err(e) => err_message = Some(e),
+/// Translate `Images.prune` filters, `label` takes `key` or `key=value` and `dangling` takes
+/// `"true"`/`"false"`; pass `dangling="false"` to prune tagged images as well.
+fn __image_prune_filters(filters: &PyDict) -> PyResult<Vec<ImagePruneFilter>> {
+    let mut rv = Vec::with_capacity(filters.len());
+    for (key, value) in filters.iter() {
+        let key: &str = key.extract()?;
+        for value in __filter_values(value)? {
+            rv.push(match key {
+                "label" => match value.split_once('=') {
+                    Some((k, v)) => ImagePruneFilter::Label(k.to_string(), v.to_string()),
+                    None => ImagePruneFilter::LabelKey(value),
+                },
+                "until" => ImagePruneFilter::Until(value),
+                "dangling" => match value.as_str() {
+                    "true" | "1" => ImagePruneFilter::Dangling(true),
+                    "false" | "0" => ImagePruneFilter::Dangling(false),
+                    _ => {
+                        return Err(exceptions::PyValueError::new_err(format!(
+                            "Unsupported image prune filter value: dangling={value:?}, expected true or false"
+                        )))
+                    }
+                },
+                _ => {
+                    return Err(exceptions::PyValueError::new_err(format!(
+                        "Unsupported image prune filter: {key:?}, expected one of dangling, label, until"
+                    )))
+                }
+            });
         }
     }
+    Ok(rv)
+}
 
-    match err_message {
-        Some(err_message) => Err(err_message),
-        _ => Ok(ok_stream_vec),
-    }
+fn __images_prune(
+    images: &Images,
+    opts: &ImagePruneOpts,
+) -> Result<ImagePrune200Response, docker_api::Error> {
+    crate::block_on(async move { images.prune(opts).await })
 }
 
-#[tokio::main]
-async fn __images_pull(
+fn __images_build(
     images: &Images,
-    pull_opts: &PullOpts,
+    opts: &ImageBuildOpts,
 ) -> Result<Vec<String>, docker_api::Error> {
-    let mut stream = images.pull(pull_opts);
-    let mut ok_stream_vec = Vec::new();
-    let mut err_message = None;
-    while let Some(pull_result) = stream.next().await {
-        match pull_result {
-            Ok(output) => ok_stream_vec.push(format!("{output:?}")),
-            Err(e) => err_message = Some(e),
+    crate::block_on(async move {
+        use futures_util::StreamExt;
+        let mut stream = images.build(opts);
+        let mut ok_stream_vec = Vec::new();
+        let mut err_message = None;
+        while let Some(build_result) = stream.next().await {
+            match build_result {
+                Ok(output) => ok_stream_vec.push(format!("{output:?}")),
+                Err(e) => err_message = Some(e),
+            }
         }
-    }
 
-    match err_message {
-        Some(err_message) => Err(err_message),
-        _ => Ok(ok_stream_vec),
-    }
+        match err_message {
+            Some(err_message) => Err(err_message),
+            _ => Ok(ok_stream_vec),
+        }
+    })
+}
+
+fn __images_pull(images: &Images, pull_opts: &PullOpts) -> Result<Vec<String>, docker_api::Error> {
+    crate::block_on(async move {
+        let mut stream = images.pull(pull_opts);
+        let mut ok_stream_vec = Vec::new();
+        let mut err_message = None;
+        while let Some(pull_result) = stream.next().await {
+            match pull_result {
+                Ok(output) => ok_stream_vec.push(format!("{output:?}")),
+                Err(e) => err_message = Some(e),
+            }
+        }
+
+        match err_message {
+            Some(err_message) => Err(err_message),
+            _ => Ok(ok_stream_vec),
+        }
+    })
 }
 
 #[pymethods]
@@ -302,16 +417,16 @@ impl Pyo3Image {
         Pyo3Image(Image::new(docker.0, name))
     }
 
-    fn __repr__(&self) -> String {
-        let inspect = __image_inspect(&self.0).unwrap();
-        format!(
+    fn __repr__(&self) -> PyResult<String> {
+        let inspect = __image_inspect(&self.0).map_err(|e| py_sys_exception!(e))?;
+        Ok(format!(
             "Image(id: {:?}, name: {})",
-            inspect.id.unwrap(),
+            inspect.id.unwrap_or_default(),
             self.name()
-        )
+        ))
     }
 
-    fn __string__(&self) -> String {
+    fn __string__(&self) -> PyResult<String> {
         self.__repr__()
     }
 
@@ -337,14 +452,7 @@ impl Pyo3Image {
     fn delete(&self) -> PyResult<String> {
         let rv = __image_delete(&self.0);
         match rv {
-            Ok(rv) => {
-                let mut r_value = "".to_owned();
-                for r in rv {
-                    let r_str = format!("{r:?}");
-                    r_value.push_str(&r_str);
-                }
-                Ok(r_value)
-            }
+            Ok(rv) => Ok(__debug_concat(rv)),
             Err(rv) => Err(py_sys_exception!(rv)),
         }
     }
@@ -353,34 +461,31 @@ impl Pyo3Image {
         let rv = __image_history(&self.0);
 
         match rv {
-            Ok(rv) => {
-                let mut r_value = "".to_owned();
-                for r in rv {
-                    let r_str = format!("{r:?}");
-                    r_value.push_str(&r_str);
-                }
-                Ok(r_value)
-            }
+            Ok(rv) => Ok(__debug_concat(rv)),
             Err(rv) => Err(py_sys_exception!(rv)),
         }
     }
 
-    fn export(&self, path: Option<&str>) -> PyResult<String> {
+    fn export(&self, py: Python, path: Option<&str>) -> PyResult<String> {
         let path = if path.is_none() {
             format!("{:?}", &self.0)
         } else {
             path.unwrap().to_string()
         };
 
-        let rv = __image_export(&self.0, path);
+        // the target is local, a bad path surfaces as an OSError before the daemon is asked
+        let export_file =
+            File::create(&path).map_err(|e| exceptions::PyOSError::new_err(e.to_string()))?;
 
-        if rv.is_some() {
-            match rv.unwrap() {
-                Ok(n) => Ok(n),
-                Err(e) => Err(py_sys_exception!(e)),
-            }
-        } else {
-            Err(exceptions::PySystemError::new_err("Unknow error occurred in export. (Seriously I don't know how you get here, open a ticket and tell me what happens)"))
+        let n = py.allow_threads(|| __image_export(&self.0, export_file))?;
+        Ok(n.to_string())
+    }
+
+    /// Export the image as an in-memory tarball, for callers that only want to read it back.
+    fn export_bytes(&self, py: Python) -> PyResult<Py<PyBytes>> {
+        match py.allow_threads(|| __image_export_bytes(&self.0)) {
+            Ok(bytes) => Ok(PyBytes::new(py, &bytes).into()),
+            Err(e) => Err(py_sys_exception!(e)),
         }
     }
 
@@ -403,62 +508,15 @@ impl Pyo3Image {
         auth_password: Option<&PyDict>,
         auth_token: Option<&PyDict>,
         tag: Option<&str>,
+        auth: Option<Pyo3RegistryAuth>,
     ) -> PyResult<()> {
-        if auth_password.is_some() && auth_token.is_some() {
-            let msg = "Got both auth_password and auth_token for image.push(). Only one of these options is allowed";
-            return Err(py_sys_exception!(msg));
-        }
-
-        let auth = if auth_password.is_some() && auth_token.is_none() {
-            let username = auth_password.unwrap().get_item("username");
-            let password = auth_password.unwrap().get_item("password");
-            let email = auth_password.unwrap().get_item("email");
-            let server_address = auth_password.unwrap().get_item("server_address");
-
-            let username = if username.is_none() {
-                None
-            } else {
-                Some(username.unwrap().extract::<String>().unwrap())
-            };
-
-            let password = if password.is_none() {
-                None
-            } else {
-                Some(password.unwrap().extract::<String>().unwrap())
-            };
-
-            let email = if email.is_none() {
-                None
-            } else {
-                Some(email.unwrap().extract::<String>().unwrap())
-            };
-
-            let server_address = if server_address.is_none() {
-                None
-            } else {
-                Some(server_address.unwrap().extract::<String>().unwrap())
-            };
-
-            let mut ra = RegistryAuth::builder();
-
-            bo_setter!(username, ra);
-            bo_setter!(password, ra);
-            bo_setter!(email, ra);
-            bo_setter!(server_address, ra);
-
-            Some(ra.build())
-        } else if auth_token.is_some() && auth_password.is_none() {
-            let token = RegistryAuth::token(
-                auth_token
-                    .unwrap()
-                    .get_item("identity_token")
-                    .unwrap()
-                    .extract::<String>()
-                    .unwrap(),
-            );
-            Some(token)
-        } else {
-            Some(RegistryAuth::builder().build())
+        let auth = match auth {
+            Some(_) if auth_password.is_some() || auth_token.is_some() => {
+                let msg = "Got auth alongside auth_password/auth_token for image.push(). Only one of these options is allowed";
+                return Err(exceptions::PyValueError::new_err(msg));
+            }
+            Some(auth) => Some(auth.0),
+            None => Some(__registry_auth(auth_password, auth_token)?),
         };
 
         let mut opts = ImagePushOpts::builder();
@@ -479,49 +537,54 @@ impl Pyo3Image {
     }
 }
 
-#[tokio::main]
-async fn __image_inspect(image: &Image) -> Result<ImageInspect, docker_api::Error> {
-    image.inspect().await
+/// The `Debug` forms of `items` back to back, written into a single buffer.
+fn __debug_concat<T: std::fmt::Debug>(items: impl IntoIterator<Item = T>) -> String {
+    let mut rv = String::new();
+    for item in items {
+        write!(rv, "{item:?}").expect("writing to a String cannot fail");
+    }
+    rv
 }
 
-#[tokio::main]
-async fn __image_delete(image: &Image) -> Result<Vec<ImageDeleteResponseItem>, docker_api::Error> {
-    image.delete().await
+fn __image_inspect(image: &Image) -> Result<ImageInspect, docker_api::Error> {
+    crate::block_on(async move { image.inspect().await })
 }
 
-#[tokio::main]
-async fn __image_history(image: &Image) -> Result<ImageHistory200Response, docker_api::Error> {
-    image.history().await
+fn __image_delete(image: &Image) -> Result<Vec<ImageDeleteResponseItem>, docker_api::Error> {
+    crate::block_on(async move { image.delete().await })
 }
 
-#[tokio::main]
-async fn __image_export(image: &Image, path: String) -> Option<Result<String, docker_api::Error>> {
-    let mut export_file = OpenOptions::new()
-        .write(true)
-        .create(true)
-        .open(path)
-        .unwrap();
-
-    let rv = image.export().next().await;
-
-    match rv {
-        None => None,
-        Some(_rv) => match _rv {
-            Ok(bytes) => {
-                let w_rv = export_file.write(&bytes).unwrap();
-                Some(Ok(format!("{w_rv:?}")))
-            }
-            Err(_rv) => Some(Err(_rv)),
-        },
-    }
+fn __image_history(image: &Image) -> Result<ImageHistory200Response, docker_api::Error> {
+    crate::block_on(async move { image.history().await })
+}
+
+/// Stream the image tarball into `export_file`. Daemon errors raise `DockerError`, failures
+/// writing the file raise `OSError`.
+fn __image_export(image: &Image, mut export_file: File) -> PyResult<usize> {
+    crate::block_on(async move {
+        let mut export_stream = image.export();
+        let mut written = 0;
+
+        while let Some(chunk) = export_stream.next().await {
+            let chunk = chunk.map_err(|e| py_sys_exception!(e))?;
+            export_file
+                .write_all(&chunk)
+                .map_err(|e| exceptions::PyOSError::new_err(e.to_string()))?;
+            written += chunk.len();
+        }
+
+        Ok(written)
+    })
+}
+
+fn __image_export_bytes(image: &Image) -> Result<Vec<u8>, docker_api::Error> {
+    crate::block_on(async move { image.export().try_concat().await })
 }
 
-#[tokio::main]
-async fn __image_tag(image: &Image, opts: &TagOpts) -> Result<(), docker_api::Error> {
-    image.tag(opts).await
+fn __image_tag(image: &Image, opts: &TagOpts) -> Result<(), docker_api::Error> {
+    crate::block_on(async move { image.tag(opts).await })
 }
 
-#[tokio::main]
-async fn __image_push(image: &Image, opts: &ImagePushOpts) -> Result<(), docker_api::Error> {
-    image.push(opts).await
+fn __image_push(image: &Image, opts: &ImagePushOpts) -> Result<(), docker_api::Error> {
+    crate::block_on(async move { image.push(opts).await })
 }
@@ -5,20 +5,120 @@ pub mod image;
 pub mod network;
 pub mod volume;
 
+use chrono::{DateTime, Utc};
+use futures_util::{Stream, StreamExt, TryStreamExt};
+use pyo3::create_exception;
+use pyo3::exceptions;
 use pyo3::prelude::*;
-use pyo3::types::PyDict;
+use pyo3::types::{PyDateTime, PyDict};
 use pyo3::wrap_pymodule;
 
-use docker_api::models::{PingInfo, SystemDataUsage200Response, SystemInfo, SystemVersion};
-use docker_api::Docker;
+use docker_api::models::{
+    EventMessage, PingInfo, SystemDataUsage200Response, SystemInfo, SystemVersion,
+};
+use docker_api::opts::{ContainerListOpts, ContainerRemoveOpts, EventFilter, EventsOpts};
+use docker_api::{Containers, Docker, Images, Networks, Volumes};
 
+use once_cell::sync::OnceCell;
 use pythonize::pythonize;
+use serde::Serialize;
+use std::future::Future;
+use std::sync::{Arc, Mutex};
 
 use container::Pyo3Containers;
-use image::Pyo3Images;
+use image::{Pyo3Images, Pyo3RegistryAuth};
 use network::Pyo3Networks;
 use volume::Pyo3Volumes;
 
+create_exception!(
+    docker_pyo3,
+    DockerError,
+    exceptions::PySystemError,
+    "Raised when the docker daemon rejects a request or cannot be reached."
+);
+
+create_exception!(
+    docker_pyo3,
+    NotFoundError,
+    DockerError,
+    "Raised when the container, image, network or volume a request refers to doesn't exist."
+);
+
+/// Whether the daemon answered `e` with a 404.
+pub(crate) fn is_not_found(e: &docker_api::Error) -> bool {
+    matches!(e, docker_api::Error::Fault { code, .. } if code.as_u16() == 404)
+}
+
+/// The Python exception for a failed request: `NotFoundError` for a 404 from the daemon,
+/// `DockerError` for anything else. Exec streams fail with the lower level connection error, so
+/// that is checked for a 404 too.
+pub(crate) fn docker_error<E: std::fmt::Display + 'static>(e: &E) -> PyErr {
+    let e_any = e as &dyn std::any::Any;
+    let not_found = match e_any.downcast_ref::<docker_api::Error>() {
+        Some(e) => is_not_found(e),
+        None => matches!(
+            e_any.downcast_ref::<docker_api::conn::Error>(),
+            Some(docker_api::conn::Error::Fault { code, .. }) if code.as_u16() == 404
+        ),
+    };
+    if not_found {
+        NotFoundError::new_err(e.to_string())
+    } else {
+        DockerError::new_err(e.to_string())
+    }
+}
+
+/// One runtime for the whole process, so a call into the daemon doesn't pay for building and
+/// tearing down a fresh one. It is stored with the pid that built it: a child made by `os.fork()`
+/// inherits the runtime but none of its worker threads, so the child builds its own on first use.
+static RUNTIME: Mutex<Option<(u32, Arc<tokio::runtime::Runtime>)>> = Mutex::new(None);
+
+fn runtime() -> Arc<tokio::runtime::Runtime> {
+    let pid = std::process::id();
+    let mut runtime = RUNTIME.lock().unwrap_or_else(|e| e.into_inner());
+    if let Some((owner, rt)) = runtime.as_ref() {
+        if *owner == pid {
+            return rt.clone();
+        }
+    }
+
+    // the parent's runtime can't be shut down from here, its threads don't exist in this process,
+    // so it is leaked rather than dropped
+    if let Some(inherited) = runtime.take() {
+        std::mem::forget(inherited);
+    }
+    let rt = Arc::new(
+        tokio::runtime::Builder::new_multi_thread()
+            .enable_all()
+            .build()
+            .expect("failed to start the tokio runtime"),
+    );
+    *runtime = Some((pid, rt.clone()));
+    rt
+}
+
+/// Drive `future` to completion on the shared runtime from synchronous pyo3 code.
+pub(crate) fn block_on<F: Future>(future: F) -> F::Output {
+    runtime().block_on(future)
+}
+
+/// Hand each item of `stream` to `f` as it arrives. The stream is polled with the GIL released
+/// and `f` runs with it held but outside the runtime, so a Python callback inside `f` may call
+/// back into the binding. The first error from the stream is raised.
+pub(crate) fn for_each_with_gil<S, T, E, F>(py: Python, stream: S, mut f: F) -> PyResult<()>
+where
+    S: Stream<Item = Result<T, E>> + Send,
+    T: Send,
+    E: std::fmt::Display + Send + 'static,
+    F: FnMut(T) -> PyResult<()>,
+{
+    let mut stream = Box::pin(stream);
+    while let Some(item) = py.allow_threads(|| block_on(stream.next())) {
+        f(item.map_err(|e| docker_error(&e))?)?;
+    }
+    Ok(())
+}
+
 #[cfg(unix)]
 static SYSTEM_DEFAULT_URI: &str = "unix:///var/run/docker.sock";
 
@@ -27,81 +127,385 @@ static SYSTEM_DEFAULT_URI: &str = "tcp://localhost:2375";
 
 #[pyclass(name = "Docker")]
 #[derive(Clone, Debug)]
-pub struct Pyo3Docker(pub Docker);
+pub struct Pyo3Docker(pub Docker, Accessors, Arc<OnceCell<SystemVersion>>);
+
+#[derive(Debug, Serialize)]
+struct SystemSnapshot {
+    version: SystemVersion,
+    info: SystemInfo,
+    ping: PingInfo,
+}
+
+/// What `Docker.cleanup` removed.
+#[derive(Debug, Default, Serialize)]
+struct CleanupReport {
+    containers: Vec<String>,
+    networks: Vec<String>,
+    volumes: Vec<String>,
+}
+
+#[derive(Debug, Serialize)]
+struct HealthCheck {
+    healthy: bool,
+    ping: Option<PingInfo>,
+    version: Option<SystemVersion>,
+    info: Option<SystemInfo>,
+    error: Option<String>,
+}
+
+/// The object kinds `Docker.batch_inspect` can look up.
+#[derive(Clone, Copy, Debug)]
+enum InspectKind {
+    Container,
+    Image,
+    Network,
+    Volume,
+}
+
+impl InspectKind {
+    fn parse(kind: &str) -> PyResult<Self> {
+        match kind {
+            "container" => Ok(InspectKind::Container),
+            "image" => Ok(InspectKind::Image),
+            "network" => Ok(InspectKind::Network),
+            "volume" => Ok(InspectKind::Volume),
+            _ => Err(exceptions::PyValueError::new_err(format!(
+                "Unknown kind: {kind:?}, expected one of container, image, network, volume"
+            ))),
+        }
+    }
+}
+
+#[derive(Debug, Serialize)]
+#[serde(untagged)]
+enum Inspected {
+    Container(docker_api::models::ContainerInspect200Response),
+    Image(docker_api::models::ImageInspect),
+    Network(docker_api::models::Network),
+    Volume(docker_api::models::Volume),
+}
+
+/// The collection wrappers handed out by `Docker`, built once per client instead of on every call.
+#[derive(Clone, Debug)]
+struct Accessors {
+    containers: Py<Pyo3Containers>,
+    images: Py<Pyo3Images>,
+    networks: Py<Pyo3Networks>,
+    volumes: Py<Pyo3Volumes>,
+}
 
 #[pymethods]
 impl Pyo3Docker {
     #[new]
     #[pyo3(signature = ( uri = SYSTEM_DEFAULT_URI))]
-    fn py_new(uri: &str) -> Self {
-        Pyo3Docker(Docker::new(uri).unwrap())
+    fn py_new(py: Python, uri: &str) -> PyResult<Self> {
+        // Only parses the uri, the daemon is first contacted by whichever call needs it.
+        let docker = Docker::new(uri).map_err(|e| {
+            exceptions::PyValueError::new_err(format!("Invalid docker uri {uri:?}: {e}"))
+        })?;
+        let accessors = Accessors {
+            containers: Py::new(py, Pyo3Containers(Containers::new(docker.clone())))?,
+            images: Py::new(py, Pyo3Images(Images::new(docker.clone())))?,
+            networks: Py::new(py, Pyo3Networks(Networks::new(docker.clone())))?,
+            volumes: Py::new(py, Pyo3Volumes(Volumes::new(docker.clone())))?,
+        };
+        Ok(Pyo3Docker(docker, accessors, Default::default()))
     }
 
-    fn version(&self) -> Py<PyAny> {
-        let sv = __version(self.clone());
-        pythonize_this!(sv)
+    /// The daemon's version, fetched on first use and cached for the lifetime of the client. The
+    /// GIL is released while fetching.
+    fn version(&self, py: Python) -> PyResult<Py<PyAny>> {
+        let sv = py
+            .allow_threads(|| self.2.get_or_try_init(|| __version(self.clone())))
+            .map_err(|e| py_sys_exception!(e))?;
+        Ok(pythonize_this!(sv))
     }
 
-    fn info(&self) -> Py<PyAny> {
-        let si = __info(self.clone());
-        pythonize_this!(si)
+    fn info(&self) -> PyResult<Py<PyAny>> {
+        match __info(self.clone()) {
+            Ok(si) => Ok(pythonize_this!(si)),
+            Err(e) => Err(py_sys_exception!(e)),
+        }
     }
 
-    fn ping(&self) -> Py<PyAny> {
-        let pi = __ping(self.clone());
-        pythonize_this!(pi)
+    fn ping(&self) -> PyResult<Py<PyAny>> {
+        match __ping(self.clone()) {
+            Ok(pi) => Ok(pythonize_this!(pi)),
+            Err(e) => Err(py_sys_exception!(e)),
+        }
     }
 
-    fn data_usage(&self) -> Py<PyAny> {
-        let du = __data_usage(self.clone());
-        pythonize_this!(du)
+    /// `version`, `info` and `ping` fetched concurrently in one call.
+    fn system_snapshot(&self) -> PyResult<Py<PyAny>> {
+        match __system_snapshot(self.clone()) {
+            Ok(snapshot) => Ok(pythonize_this!(snapshot)),
+            Err(e) => Err(py_sys_exception!(e)),
+        }
     }
 
-    fn containers(&'_ self) -> Pyo3Containers {
-        Pyo3Containers::new(self.clone())
+    fn health_check(&self) -> Py<PyAny> {
+        let hc = __health_check(self.clone());
+        pythonize_this!(hc)
     }
 
-    fn images(&'_ self) -> Pyo3Images {
-        Pyo3Images::new(self.clone())
+    fn events(
+        &self,
+        since: Option<&PyDateTime>,
+        until: Option<&PyDateTime>,
+        container: Option<&str>,
+    ) -> PyResult<Py<PyAny>> {
+        let mut opts = EventsOpts::builder();
+
+        if let Some(since) = since {
+            let rs_since: DateTime<Utc> = since.extract()?;
+            opts = opts.since(&rs_since);
+        }
+
+        // without an upper bound the daemon keeps the stream open forever
+        let rs_until: DateTime<Utc> = match until {
+            Some(until) => until.extract()?,
+            None => Utc::now(),
+        };
+        opts = opts.until(&rs_until);
+
+        if let Some(container) = container {
+            opts = opts.filter(vec![EventFilter::Container(container.to_string())]);
+        }
+
+        match __events(self.clone(), &opts.build()) {
+            Ok(events) => Ok(pythonize_this!(events)),
+            Err(e) => Err(py_sys_exception!(e)),
+        }
+    }
+
+    fn data_usage(&self) -> PyResult<Py<PyAny>> {
+        match __data_usage(self.clone()) {
+            Ok(du) => Ok(pythonize_this!(du)),
+            Err(e) => Err(py_sys_exception!(e)),
+        }
+    }
+
+    /// Inspect several objects concurrently, `requests` is a list of `(kind, name)` pairs with kind
+    /// one of container, image, network or volume. Results come back in request order, each either
+    /// the inspect payload or the `DockerError` that lookup failed with, so one missing object does
+    /// not hide the others.
+    fn batch_inspect(&self, py: Python, requests: Vec<(&str, &str)>) -> PyResult<Vec<PyObject>> {
+        let requests = requests
+            .into_iter()
+            .map(|(kind, name)| Ok((InspectKind::parse(kind)?, name)))
+            .collect::<PyResult<Vec<_>>>()?;
+
+        __batch_inspect(self.clone(), &requests)
+            .into_iter()
+            .map(|rv| match rv {
+                Ok(rv) => Ok(pythonize(py, &rv)?),
+                Err(e) => Ok(docker_error(&e).value(py).into_py(py)),
+            })
+            .collect()
+    }
+
+    /// Remove every container, network and volume whose name starts with `prefix`. Everything is
+    /// listed in one concurrent pass and removed concurrently, containers first (forced, with their
+    /// anonymous volumes) so networks and volumes are free by the time they go. Removal is best
+    /// effort, the returned dict names what was actually removed.
+    fn cleanup(&self, prefix: &str) -> PyResult<Py<PyAny>> {
+        if prefix.is_empty() {
+            return Err(exceptions::PyValueError::new_err(
+                "Refusing to clean up with an empty prefix, it would match everything",
+            ));
+        }
+
+        match __cleanup(self.clone(), prefix) {
+            Ok(report) => Ok(pythonize_this!(report)),
+            Err(e) => Err(py_sys_exception!(e)),
+        }
+    }
+
+    fn prepare_auth(
+        &self,
+        auth_password: Option<&PyDict>,
+        auth_token: Option<&PyDict>,
+    ) -> PyResult<Pyo3RegistryAuth> {
+        let auth = image::__registry_auth(auth_password, auth_token)?;
+        Ok(Pyo3RegistryAuth(auth))
+    }
+
+    fn containers(&self, py: Python) -> Py<Pyo3Containers> {
+        self.1.containers.clone_ref(py)
+    }
+
+    fn images(&self, py: Python) -> Py<Pyo3Images> {
+        self.1.images.clone_ref(py)
     }
 
-    fn networks(&'_ self) -> Pyo3Networks {
-        Pyo3Networks::new(self.clone())
+    fn networks(&self, py: Python) -> Py<Pyo3Networks> {
+        self.1.networks.clone_ref(py)
     }
 
-    fn volumes(&'_ self) -> Pyo3Volumes {
-        Pyo3Volumes::new(self.clone())
+    fn volumes(&self, py: Python) -> Py<Pyo3Volumes> {
+        self.1.volumes.clone_ref(py)
     }
 }
 
-#[tokio::main]
-async fn __version(docker: Pyo3Docker) -> SystemVersion {
-    let version = docker.0.version().await;
-    version.unwrap()
+fn __version(docker: Pyo3Docker) -> Result<SystemVersion, docker_api::Error> {
+    crate::block_on(async move { docker.0.version().await })
 }
 
-#[tokio::main]
-async fn __info(docker: Pyo3Docker) -> SystemInfo {
-    let info = docker.0.info().await;
-    info.unwrap()
+fn __info(docker: Pyo3Docker) -> Result<SystemInfo, docker_api::Error> {
+    crate::block_on(async move { docker.0.info().await })
+}
+
+fn __ping(docker: Pyo3Docker) -> Result<PingInfo, docker_api::Error> {
+    crate::block_on(async move { docker.0.ping().await })
+}
+
+fn __system_snapshot(docker: Pyo3Docker) -> Result<SystemSnapshot, docker_api::Error> {
+    crate::block_on(async move {
+        let (version, info, ping) =
+            tokio::try_join!(docker.0.version(), docker.0.info(), docker.0.ping())?;
+        Ok(SystemSnapshot {
+            version,
+            info,
+            ping,
+        })
+    })
+}
+
+fn __health_check(docker: Pyo3Docker) -> HealthCheck {
+    crate::block_on(async move {
+        let (ping, version, info) =
+            tokio::join!(docker.0.ping(), docker.0.version(), docker.0.info());
+
+        let error = match (&ping, &version, &info) {
+            (Err(e), _, _) | (_, Err(e), _) | (_, _, Err(e)) => Some(e.to_string()),
+            _ => None,
+        };
+
+        HealthCheck {
+            healthy: error.is_none(),
+            ping: ping.ok(),
+            version: version.ok(),
+            info: info.ok(),
+            error,
+        }
+    })
+}
+
+fn __batch_inspect(
+    docker: Pyo3Docker,
+    requests: &[(InspectKind, &str)],
+) -> Vec<Result<Inspected, docker_api::Error>> {
+    crate::block_on(async move {
+        let docker = &docker.0;
+        let lookups = requests.iter().map(|(kind, name)| async move {
+            match kind {
+                InspectKind::Container => docker
+                    .containers()
+                    .get(*name)
+                    .inspect()
+                    .await
+                    .map(Inspected::Container),
+                InspectKind::Image => docker
+                    .images()
+                    .get(*name)
+                    .inspect()
+                    .await
+                    .map(Inspected::Image),
+                InspectKind::Network => docker
+                    .networks()
+                    .get(*name)
+                    .inspect()
+                    .await
+                    .map(Inspected::Network),
+                InspectKind::Volume => docker
+                    .volumes()
+                    .get(*name)
+                    .inspect()
+                    .await
+                    .map(Inspected::Volume),
+            }
+        });
+        futures_util::future::join_all(lookups).await
+    })
+}
+
+fn __cleanup(docker: Pyo3Docker, prefix: &str) -> Result<CleanupReport, docker_api::Error> {
+    crate::block_on(async move {
+        use futures_util::future::join_all;
+
+        let docker = &docker.0;
+        let (containers, networks, volumes) = tokio::try_join!(
+            docker
+                .containers()
+                .list(&ContainerListOpts::builder().all(true).build()),
+            docker.networks().list(&Default::default()),
+            docker.volumes().list(&Default::default()),
+        )?;
+
+        let containers = containers.into_iter().filter_map(|c| {
+            let names = c.names.unwrap_or_default();
+            let matches = names
+                .iter()
+                .any(|name| name.trim_start_matches('/').starts_with(prefix));
+            c.id.filter(|_| matches)
+        });
+        let networks = networks
+            .into_iter()
+            .filter_map(|n| n.name)
+            .filter(|name| name.starts_with(prefix));
+        let volumes = volumes
+            .volumes
+            .into_iter()
+            .map(|v| v.name)
+            .filter(|name| name.starts_with(prefix));
+
+        let remove_opts = ContainerRemoveOpts::builder()
+            .force(true)
+            .volumes(true)
+            .build();
+        let remove_opts = &remove_opts;
+        let containers = join_all(containers.map(|id| async move {
+            let rv = docker
+                .containers()
+                .get(id.as_str())
+                .remove(&remove_opts)
+                .await;
+            rv.ok().map(|_| id)
+        }));
+        let containers: Vec<String> = containers.await.into_iter().flatten().collect();
+
+        let networks = join_all(networks.map(|name| async move {
+            let rv = docker.networks().get(name.as_str()).delete().await;
+            rv.ok().map(|_| name)
+        }));
+        let volumes = join_all(volumes.map(|name| async move {
+            let rv = docker.volumes().get(name.as_str()).delete().await;
+            rv.ok().map(|_| name)
+        }));
+        let (networks, volumes) = tokio::join!(networks, volumes);
+
+        Ok(CleanupReport {
+            containers,
+            networks: networks.into_iter().flatten().collect(),
+            volumes: volumes.into_iter().flatten().collect(),
+        })
+    })
 }
 
-#[tokio::main]
-async fn __ping(docker: Pyo3Docker) -> PingInfo {
-    let ping = docker.0.ping().await;
-    ping.unwrap()
+fn __events(docker: Pyo3Docker, opts: &EventsOpts) -> Result<Vec<EventMessage>, docker_api::Error> {
+    crate::block_on(async move { docker.0.events(opts).try_collect().await })
 }
 
-#[tokio::main]
-async fn __data_usage(docker: Pyo3Docker) -> SystemDataUsage200Response {
-    let du = docker.0.data_usage().await;
-    du.unwrap()
+fn __data_usage(docker: Pyo3Docker) -> Result<SystemDataUsage200Response, docker_api::Error> {
+    crate::block_on(async move { docker.0.data_usage().await })
 }
 
 /// A Python module implemented in Rust.
 #[pymodule]
 pub fn docker_pyo3(_py: Python, m: &PyModule) -> PyResult<()> {
     m.add_class::<Pyo3Docker>()?;
+    m.add("DockerError", _py.get_type::<DockerError>())?;
+    m.add("NotFoundError", _py.get_type::<NotFoundError>())?;
 
     m.add_wrapped(wrap_pymodule!(image::image))?;
     m.add_wrapped(wrap_pymodule!(container::container))?;
@@ -14,6 +14,6 @@ macro_rules! pythonize_this {
 
 macro_rules! py_sys_exception {
     ($o:ident) => {
-        exceptions::PySystemError::new_err(format!("{}", $o))
+        crate::docker_error(&$o)
     };
 }
@@ -1,7 +1,8 @@
 use std::collections::HashMap;
 
+use crate::container::__filter_values;
 use crate::Pyo3Docker;
-use docker_api::opts::{ContainerConnectionOpts, NetworkPruneOpts};
+use docker_api::opts::{ContainerConnectionOpts, NetworkPruneFilter, NetworkPruneOpts};
 use docker_api::opts::{ContainerDisconnectionOpts, NetworkCreateOpts};
 use docker_api::{models::NetworkPrune200Response, Network, Networks};
 use pyo3::exceptions;
@@ -35,6 +36,11 @@ impl Pyo3Networks {
         Pyo3Network(self.0.get(id))
     }
 
+    /// Whether a network with this id or name exists, without raising when it doesn't.
+    pub fn exists(&self, id: &str) -> PyResult<bool> {
+        __networks_exists(&self.0, id).map_err(|e| py_sys_exception!(e))
+    }
+
     pub fn list(&self) -> PyResult<Py<PyAny>> {
         let rv = __networks_list(&self.0);
 
@@ -44,8 +50,14 @@ impl Pyo3Networks {
         }
     }
 
-    pub fn prune(&self) -> PyResult<Py<PyAny>> {
-        let rv = __networks_prune(&self.0, &Default::default());
+    /// Remove unused networks, optionally only those matching `{"label": ..., "until": ...}`.
+    pub fn prune(&self, filters: Option<&PyDict>) -> PyResult<Py<PyAny>> {
+        let mut opts = NetworkPruneOpts::builder();
+        if let Some(filters) = filters {
+            opts = opts.filter(__network_prune_filters(filters)?);
+        }
+
+        let rv = __networks_prune(&self.0, &opts.build());
 
         match rv {
             Ok(rv) => Ok(pythonize_this!(rv)),
@@ -67,16 +79,14 @@ impl Pyo3Networks {
     ) -> PyResult<Pyo3Network> {
         let mut network_opts = NetworkCreateOpts::builder(name);
 
-        let options: Option<HashMap<&str, &str>> = if options.is_some() {
-            Some(options.unwrap().extract().unwrap())
-        } else {
-            None
+        let options: Option<HashMap<&str, &str>> = match options {
+            Some(options) => Some(options.extract()?),
+            None => None,
         };
 
-        let labels: Option<HashMap<&str, &str>> = if options.is_some() {
-            Some(labels.unwrap().extract().unwrap())
-        } else {
-            None
+        let labels: Option<HashMap<&str, &str>> = match labels {
+            Some(labels) => Some(labels.extract()?),
+            None => None,
         };
 
         bo_setter!(check_duplicate, network_opts);
@@ -96,27 +106,57 @@ impl Pyo3Networks {
     }
 }
 
-#[tokio::main]
-async fn __networks_list(
+/// Translate `Networks.prune` filters, labels are given as `key` or `key=value`.
+fn __network_prune_filters(filters: &PyDict) -> PyResult<Vec<NetworkPruneFilter>> {
+    let mut rv = Vec::with_capacity(filters.len());
+    for (key, value) in filters.iter() {
+        let key: &str = key.extract()?;
+        for value in __filter_values(value)? {
+            rv.push(match key {
+                "label" => match value.split_once('=') {
+                    Some((k, v)) => NetworkPruneFilter::Label(k.to_string(), v.to_string()),
+                    None => NetworkPruneFilter::LabelKey(value),
+                },
+                "until" => NetworkPruneFilter::Until(value),
+                _ => {
+                    return Err(exceptions::PyValueError::new_err(format!(
+                        "Unsupported network prune filter: {key:?}, expected one of label, until"
+                    )))
+                }
+            });
+        }
+    }
+    Ok(rv)
+}
+
+fn __networks_exists(networks: &Networks, id: &str) -> Result<bool, docker_api::Error> {
+    crate::block_on(async move {
+        match networks.get(id).inspect().await {
+            Ok(_) => Ok(true),
+            Err(e) if crate::is_not_found(&e) => Ok(false),
+            Err(e) => Err(e),
+        }
+    })
+}
+
+fn __networks_list(
     networks: &Networks,
 ) -> Result<Vec<docker_api::models::Network>, docker_api::Error> {
-    networks.list(&Default::default()).await
+    crate::block_on(async move { networks.list(&Default::default()).await })
 }
 
-#[tokio::main]
-async fn __networks_prune(
+fn __networks_prune(
     networks: &Networks,
     opts: &NetworkPruneOpts,
 ) -> Result<NetworkPrune200Response, docker_api::Error> {
-    networks.prune(opts).await
+    crate::block_on(async move { networks.prune(opts).await })
 }
 
-#[tokio::main]
-async fn __networks_create(
+fn __networks_create(
     networks: &Networks,
     opts: &NetworkCreateOpts,
 ) -> Result<Network, docker_api::Error> {
-    networks.create(opts).await
+    crate::block_on(async move { networks.create(opts).await })
 }
 
 #[pymethods]
@@ -221,30 +261,24 @@ impl Pyo3Network {
     }
 }
 
-#[tokio::main]
-async fn __network_inspect(
-    network: &Network,
-) -> Result<docker_api::models::Network, docker_api::Error> {
-    network.inspect().await
+fn __network_inspect(network: &Network) -> Result<docker_api::models::Network, docker_api::Error> {
+    crate::block_on(async move { network.inspect().await })
 }
 
-#[tokio::main]
-async fn __network_delete(network: &Network) -> Result<(), docker_api::Error> {
-    network.delete().await
+fn __network_delete(network: &Network) -> Result<(), docker_api::Error> {
+    crate::block_on(async move { network.delete().await })
 }
 
-#[tokio::main]
-async fn __network_connect(
+fn __network_connect(
     network: &Network,
     opts: &ContainerConnectionOpts,
 ) -> Result<(), docker_api::Error> {
-    network.connect(opts).await
+    crate::block_on(async move { network.connect(opts).await })
 }
 
-#[tokio::main]
-async fn __network_disconnect(
+fn __network_disconnect(
     network: &Network,
     opts: &ContainerDisconnectionOpts,
 ) -> Result<(), docker_api::Error> {
-    network.disconnect(opts).await
+    crate::block_on(async move { network.disconnect(opts).await })
 }
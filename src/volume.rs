@@ -4,10 +4,10 @@ use docker_api::{
     opts::{VolumeCreateOpts, VolumeListOpts, VolumePruneOpts},
     Volume, Volumes,
 };
+use pyo3::exceptions;
 use pyo3::prelude::*;
 
 use crate::Pyo3Docker;
-use pyo3::exceptions;
 use pyo3::types::PyDict;
 use pythonize::pythonize;
 
@@ -37,6 +37,11 @@ impl Pyo3Volumes {
         Pyo3Volume(self.0.get(name))
     }
 
+    /// Whether a volume with this name exists, without raising when it doesn't.
+    pub fn exists(&self, name: &str) -> PyResult<bool> {
+        __volumes_exists(&self.0, name).map_err(|e| py_sys_exception!(e))
+    }
+
     pub fn prune(&self) -> PyResult<Py<PyAny>> {
         let rv = __volumes_prune(&self.0, &Default::default());
 
@@ -62,6 +67,12 @@ impl Pyo3Volumes {
         _driver_opts: Option<&PyDict>,
         _labels: Option<&PyDict>,
     ) -> PyResult<Py<PyAny>> {
+        // the naming rule belongs to the local driver, plugins may accept other names. An empty
+        // name asks the daemon for an anonymous volume, so it is passed through untouched
+        if let (Some(name), None | Some("local")) = (name.filter(|n| !n.is_empty()), driver) {
+            __validate_volume_name(name)?;
+        }
+
         let mut opts = VolumeCreateOpts::builder();
         bo_setter!(name, opts);
         bo_setter!(driver, opts);
@@ -77,28 +88,51 @@ impl Pyo3Volumes {
     }
 }
 
-#[tokio::main]
-async fn __volumes_prune(
+/// Mirror the `local` driver's `[a-zA-Z0-9][a-zA-Z0-9_.-]+` check so a bad name fails without a round trip.
+fn __validate_volume_name(name: &str) -> PyResult<()> {
+    let mut chars = name.chars();
+    let valid = matches!(chars.next(), Some(c) if c.is_ascii_alphanumeric())
+        && name.len() > 1
+        && chars.all(|c| c.is_ascii_alphanumeric() || matches!(c, '_' | '.' | '-'));
+
+    if valid {
+        Ok(())
+    } else {
+        Err(exceptions::PyValueError::new_err(format!(
+            "Invalid volume name: {name:?}, only [a-zA-Z0-9][a-zA-Z0-9_.-] are allowed"
+        )))
+    }
+}
+
+fn __volumes_exists(volumes: &Volumes, name: &str) -> Result<bool, docker_api::Error> {
+    crate::block_on(async move {
+        match volumes.get(name).inspect().await {
+            Ok(_) => Ok(true),
+            Err(e) if crate::is_not_found(&e) => Ok(false),
+            Err(e) => Err(e),
+        }
+    })
+}
+
+fn __volumes_prune(
     volumes: &Volumes,
     opts: &VolumePruneOpts,
 ) -> Result<VolumePrune200Response, docker_api::Error> {
-    volumes.prune(opts).await
+    crate::block_on(async move { volumes.prune(opts).await })
 }
 
-#[tokio::main]
-async fn __volumes_list(
+fn __volumes_list(
     volumes: &Volumes,
     opts: &VolumeListOpts,
 ) -> Result<VolumeList200Response, docker_api::Error> {
-    volumes.list(opts).await
+    crate::block_on(async move { volumes.list(opts).await })
 }
 
-#[tokio::main]
-async fn __volumes_create(
+fn __volumes_create(
     volumes: &Volumes,
     opts: &VolumeCreateOpts,
 ) -> Result<docker_api::models::Volume, docker_api::Error> {
-    volumes.create(opts).await
+    crate::block_on(async move { volumes.create(opts).await })
 }
 
 #[pymethods]
@@ -131,14 +165,10 @@ impl Pyo3Volume {
     }
 }
 
-#[tokio::main]
-async fn __volume_inspect(
-    volume: &Volume,
-) -> Result<docker_api::models::Volume, docker_api::Error> {
-    volume.inspect().await
+fn __volume_inspect(volume: &Volume) -> Result<docker_api::models::Volume, docker_api::Error> {
+    crate::block_on(async move { volume.inspect().await })
 }
 
-#[tokio::main]
-async fn __volume_delete(volume: &Volume) -> Result<(), docker_api::Error> {
-    volume.delete().await
+fn __volume_delete(volume: &Volume) -> Result<(), docker_api::Error> {
+    crate::block_on(async move { volume.delete().await })
 }